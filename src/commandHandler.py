@@ -3,7 +3,7 @@ from urllib.parse import urlparse
 
 
 class CommandHandler(ABC):
-    def __init__(self, app, auth, apis, state, youtube, worksheet, n8n, youtube_channel_id: str):
+    def __init__(self, app, auth, apis, state, youtube, worksheet, n8n, youtube_channel_id: str, history=None, prober=None):
         self.app = app
         self.auth = auth
         self.apis = apis
@@ -12,11 +12,18 @@ class CommandHandler(ABC):
         self.worksheet = worksheet
         self.n8n = n8n
         self.youtube_channel_id = youtube_channel_id
+        self.history = history
+        self.prober = prober
 
     @abstractmethod
     def register(self):
         ...
 
+    def _history_key(self) -> str:
+        if len(getattr(self.youtube, "channel_ids", [])) > 1:
+            return "all"
+        return self.youtube_channel_id or "default"
+
     @staticmethod
     def _is_valid_url(u: str) -> bool:
         try:
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from managers.sheetsGateway import sheetsGateway
+
+
+class sheetMirror:
+    """Локальная SQLite-копия листов Google Sheets.
+
+    Инкрементальная синхронизация перечитывает последнюю известную строку (агент обновляет
+    счётчики прямо в ней) и дочитывает новые; полная сверка (reconcile) раз в reconcile_interval
+    ловит правки и удаления более старых строк.
+    """
+
+    def __init__(self, path: str = "sheets_mirror.sqlite3", *, max_lag: float = 30.0, reconcile_interval: float = 3600.0, gateway: Optional[sheetsGateway] = None) -> None:
+        self.path = Path(path)
+        self.max_lag = float(max_lag)
+        self.reconcile_interval = float(reconcile_interval)
+        self.gateway = gateway or sheetsGateway()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows (sheet TEXT NOT NULL, row_no INTEGER NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (sheet, row_no)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (sheet TEXT PRIMARY KEY, row_count INTEGER NOT NULL, "
+            "synced_at REAL NOT NULL, reconciled_at REAL NOT NULL)"
+        )
+
+    @staticmethod
+    def _key(ws) -> str:
+        return (ws.title or "").strip().lower()
+
+    def _meta(self, sheet: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT row_count, synced_at, reconciled_at FROM meta WHERE sheet = ?", (sheet,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"row_count": row[0], "synced_at": row[1], "reconciled_at": row[2]}
+
+    def age(self, ws, *, whole: bool = False) -> Optional[float]:
+        """Возраст данных в секундах; None — лист ещё не синхронизирован. По умолчанию — для хвоста
+        (последняя строка перечитывается при каждой синхронизации), whole=True — для всего листа,
+        правки старых строк которого видны только после полной сверки."""
+        meta = self._meta(self._key(ws))
+        if meta is None:
+            return None
+        return time.time() - (meta["reconciled_at"] if whole else meta["synced_at"])
+
+    def sync(self, ws, *, force_full: bool = False) -> int:
+        """Обновить зеркало; возвращает число загруженных строк."""
+        sheet = self._key(ws)
+        with self._lock:
+            meta = self._meta(sheet)
+            now = time.time()
+            if force_full or meta is None or now - meta["reconciled_at"] >= self.reconcile_interval:
+                values = self.gateway.read(ws.get_all_values)
+                self._write(
+                    "DELETE FROM rows WHERE sheet = ?", [(sheet,)],
+                    [(sheet, i, json.dumps(r, ensure_ascii=False)) for i, r in enumerate(values, start=1)],
+                    ("INSERT OR REPLACE INTO meta(sheet, row_count, synced_at, reconciled_at) VALUES (?, ?, ?, ?)",
+                     (sheet, len(values), now, now)),
+                )
+                return len(values)
+
+            start = max(1, meta["row_count"])
+            values = self.gateway.read(ws.get, f"A{start}:ZZZ") or []
+            if meta["row_count"] and not values:
+                # последняя известная строка исчезла — лист укоротили, нужна полная сверка
+                return self.sync(ws, force_full=True)
+            self._write(
+                "DELETE FROM rows WHERE sheet = ? AND row_no >= ?", [(sheet, start)],
+                [(sheet, start + i, json.dumps(list(r), ensure_ascii=False)) for i, r in enumerate(values)],
+                ("UPDATE meta SET row_count = ?, synced_at = ? WHERE sheet = ?",
+                 (start - 1 + len(values), now, sheet)),
+            )
+            return len(values)
+
+    def _write(self, delete_sql: Optional[str], delete_args: list, rows: list, meta_stmt: tuple) -> None:
+        self._conn.execute("BEGIN")
+        try:
+            if delete_sql:
+                self._conn.executemany(delete_sql, delete_args)
+            self._conn.executemany("INSERT OR REPLACE INTO rows(sheet, row_no, data) VALUES (?, ?, ?)", rows)
+            self._conn.execute(*meta_stmt)
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def values(self, ws) -> List[List[str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM rows WHERE sheet = ? ORDER BY row_no", (self._key(ws),)
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def _ensure_fresh(self, ws) -> None:
+        age = self.age(ws)
+        if age is None or age >= self.max_lag:
+            self.sync(ws)
+
+    def read(self, ws) -> List[List[str]]:
+        """Значения листа из зеркала; если данные старше max_lag — сначала догоняем Google."""
+        self._ensure_fresh(ws)
+        return self.values(ws)
+
+    def tail(self, ws) -> Tuple[Optional[List[str]], Optional[List[str]]]:
+        """(заголовок, последняя строка) без декодирования всего листа: первая непустая строка
+        сверху и первая непустая снизу, ниже заголовка. None — такой строки нет."""
+        self._ensure_fresh(ws)
+        sheet = self._key(ws)
+        with self._lock:
+            header_no, header = self._first_non_empty(
+                "SELECT row_no, data FROM rows WHERE sheet = ? ORDER BY row_no", (sheet,)
+            )
+            if header is None:
+                return None, None
+            _, last = self._first_non_empty(
+                "SELECT row_no, data FROM rows WHERE sheet = ? AND row_no > ? ORDER BY row_no DESC",
+                (sheet, header_no),
+            )
+        return header, last
+
+    def _first_non_empty(self, sql: str, args: tuple) -> Tuple[Optional[int], Optional[List[str]]]:
+        # курсор читается лениво: обычно хватает одной-двух строк
+        for row_no, data in self._conn.execute(sql, args):
+            row = json.loads(data)
+            if any(str(cell).strip() for cell in row):
+                return row_no, row
+        return None, None
@@ -0,0 +1,83 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class sheetWriteBuffer:
+    """Буфер строк для записи в Google Sheets с локальным spool-файлом (JSONL).
+
+    Строка сначала дописывается в spool и только потом считается принятой, поэтому
+    при падении бота несброшенные строки поднимаются из файла при следующем старте.
+    """
+
+    def __init__(self, path: str = "sheets_spool.jsonl") -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._rows: List[Dict[str, Any]] = []
+        self._oldest_at: Optional[float] = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        text = self.path.read_text(encoding="utf-8")
+        dropped = 0
+        for line in text.splitlines():
+            try:
+                self._rows.append(json.loads(line))
+            except Exception:
+                dropped += 1
+        if self._rows:
+            self._oldest_at = time.monotonic()
+        # оборванную строку (падение посреди записи) убираем из файла сразу,
+        # иначе следующий add допишет JSON прямо к её хвосту и строка потеряется
+        if dropped or (text and not text.endswith("\n")):
+            self._rewrite()
+
+    def _rewrite(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for row in self._rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self.path)
+
+    def add(self, sheet: str, values: List[Any], key: Optional[str] = None) -> int:
+        entry = {"sheet": sheet, "values": values, "key": key}
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._rows.append(entry)
+            if self._oldest_at is None:
+                self._oldest_at = time.monotonic()
+            return len(self._rows)
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def oldest_age(self) -> float:
+        if self._oldest_at is None:
+            return 0.0
+        return time.monotonic() - self._oldest_at
+
+    def peek(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """Снимок текущих строк для сброса: (сколько взяли, строки)."""
+        with self._lock:
+            rows = list(self._rows)
+        return len(rows), rows
+
+    def commit(self, count: int) -> None:
+        """Убрать первые count строк после успешной записи в Sheets."""
+        with self._lock:
+            self._rows = self._rows[count:]
+            self._oldest_at = time.monotonic() if self._rows else None
+            self._rewrite()
@@ -1,28 +1,103 @@
 import re
+import time
+import asyncio
+import threading
+from collections import defaultdict
 from typing import Optional, Dict, Any, List
 
 import pandas as pd
 from gspread import service_account, Worksheet
 from gspread.exceptions import WorksheetNotFound
 
+from managers.blockingExecutor import run_blocking
+from managers.videoIndex import canonical_key
+from extractors.sheetWriteBuffer import sheetWriteBuffer
+from extractors.sheetMirror import sheetMirror
+from managers.sheetsGateway import sheetsGateway
+
 
 class worksheetExtractor:
+    METRIC_COLUMNS = {
+        "videos proccessed": "videos_processed",
+        "clips proccessed": "clips_processed",
+        "videos in queue": "videos_in_queue",
+        "clips in queue": "clips_in_queue",
+    }
+    DESCRIPTION_COLUMNS = ["timestamp", "chat_id", "video_url", "description"]
+
     def __init__(
         self,
         file_location: str,
         spreadsheet_url: str,
         *,
-        worksheet_index: Optional[int] = None
+        worksheet_index: Optional[int] = None,
+        metadata_ttl: float = 600.0,
+        spool_path: str = "sheets_spool.jsonl",
+        flush_batch: int = 50,
+        flush_interval: float = 30.0,
+        mirror: Optional[sheetMirror] = None,
+        gateway: Optional[sheetsGateway] = None
     ):
         self.spreadsheet_url = spreadsheet_url
         self.worksheet_index = worksheet_index
         self.file_location = file_location
-        gc = service_account(filename=self.file_location)
-        self.sh = gc.open_by_url(self.spreadsheet_url)
-        if self.worksheet_index is not None:
-            self.ws = self.sh.get_worksheet(self.worksheet_index)
-        else:
-            self.ws = self.sh.sheet1
+        self.metadata_ttl = metadata_ttl
+        self._ws_registry: Dict[str, Worksheet] = {}
+        self._ws_registry_at = 0.0
+        self._headers_cache: Dict[int, Dict[str, Any]] = {}
+        self._write_buffer = sheetWriteBuffer(spool_path)
+        self.flush_batch = max(1, int(flush_batch))
+        self.flush_interval = float(flush_interval)
+        self._flush_wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        # сброс может идти из пула потоков и при остановке бота: peek/append_rows/commit — под одной блокировкой
+        self._flush_thread_lock = threading.Lock()
+        self._url_rows: Dict[str, Dict[str, Any]] = {}
+        self.mirror = mirror
+        self.gateway = gateway or sheetsGateway()
+        self._init_lock = threading.Lock()
+        self._sh = None
+        self._ws = None
+        self.status = "not initialized"
+
+    # клиенты Sheets создаются при первом обращении (или прогреве из MyBot._bootstrap),
+    # чтобы недоступность Google не мешала боту стартовать
+    @property
+    def sh(self):
+        if self._sh is None:
+            with self._init_lock:
+                if self._sh is None:
+                    try:
+                        gc = service_account(filename=self.file_location)
+                        self._sh = self.gateway.read(gc.open_by_url, self.spreadsheet_url)
+                    except Exception as e:
+                        self.status = f"error: {e}"
+                        raise
+                    self.status = "ready"
+        return self._sh
+
+    @property
+    def ws(self) -> Worksheet:
+        if self._ws is None:
+            sh = self.sh
+            with self._init_lock:
+                if self._ws is None:
+                    if self.worksheet_index is not None:
+                        self._ws = self.gateway.read(sh.get_worksheet, self.worksheet_index)
+                    else:
+                        self._ws = self.gateway.read(sh.get_worksheet, 0)
+        return self._ws
+
+    def warm_up(self) -> None:
+        _ = self.ws
+        self._refresh_worksheet_registry()
+
+    async def warm_up_async(self) -> str:
+        try:
+            await self.gateway.run(self.warm_up, key=("warm_up",))
+        except Exception:
+            pass
+        return self.status
 
     @staticmethod
     def _to_int_safe(v: Any, default: int = 0) -> int:
@@ -61,15 +136,48 @@ class worksheetExtractor:
                 return idx
         return None
 
+    def _refresh_worksheet_registry(self) -> None:
+        all_ws = self.gateway.read(self.sh.worksheets)
+        self._ws_registry = {(ws.title or "").strip().lower(): ws for ws in all_ws}
+        self._ws_registry_at = time.monotonic()
+
     def _get_worksheet_ci(self, name: str) -> Worksheet:
+        """Лист по имени без учёта регистра. Список листов кэшируется на metadata_ttl секунд
+        и перечитывается при промахе."""
         target = (name or "").strip().lower()
-        all_ws = self.sh.worksheets()
-        for ws in all_ws:
-            if (ws.title or "").strip().lower() == target:
-                return ws
-        titles = [ws.title for ws in all_ws]
+        refreshed = False
+        if not self._ws_registry or time.monotonic() - self._ws_registry_at >= self.metadata_ttl:
+            self._refresh_worksheet_registry()
+            refreshed = True
+        ws = self._ws_registry.get(target)
+        if ws is None and not refreshed:
+            self._refresh_worksheet_registry()
+            ws = self._ws_registry.get(target)
+        if ws is not None:
+            return ws
+        titles = [ws.title for ws in self._ws_registry.values()]
         raise WorksheetNotFound(f"'{name}' not found. Available sheets: {titles}")
 
+    def _cached_header_index(self, ws: Worksheet, hdr_row: int) -> Optional[Dict[str, int]]:
+        entry = self._headers_cache.get(ws.id)
+        if entry is None or entry["row"] != hdr_row:
+            return None
+        if time.monotonic() - entry["at"] >= self.metadata_ttl:
+            self._headers_cache.pop(ws.id, None)
+            return None
+        if not all(src in entry["index"] for src in self.METRIC_COLUMNS):
+            self._headers_cache.pop(ws.id, None)
+            return None
+        return entry["index"]
+
+    @staticmethod
+    def _header_index(headers: List[str]) -> Dict[str, int]:
+        # при повторяющихся заголовках побеждает последний — как в _get_headers_map
+        index: Dict[str, int] = {}
+        for i, h in enumerate(headers):
+            index[(h or "").strip()] = i
+        return index
+
     def _get_headers_map(self, headers: List[str], row_values: List[str]) -> Dict[str, Any]:
         mp: Dict[str, Any] = {}
         for i, h in enumerate(headers):
@@ -79,49 +187,105 @@ class worksheetExtractor:
         return mp
 
     def _extract_exact_metrics(self, row_map: Dict[str, Any]) -> Dict[str, int]:
-        required = {
-            "videos proccessed": "videos_processed",
-            "clips proccessed": "clips_processed",
-            "videos in queue": "videos_in_queue",
-            "clips in queue": "clips_in_queue",
-        }
-        out: Dict[str, int] = {
+        out = self._empty_metrics()
+        for src, dst in self.METRIC_COLUMNS.items():
+            if src in row_map:
+                out[dst] = self._to_int_safe(row_map[src], 0)
+        return out
+
+    def _extract_indexed_metrics(self, col_index: Dict[str, int], row_values: List[str]) -> Dict[str, int]:
+        out = self._empty_metrics()
+        for src, dst in self.METRIC_COLUMNS.items():
+            i = col_index.get(src)
+            if i is not None:
+                out[dst] = self._to_int_safe(row_values[i] if i < len(row_values) else "", 0)
+        return out
+
+    @staticmethod
+    def _empty_metrics() -> Dict[str, int]:
+        return {
             "videos_processed": 0,
             "clips_processed": 0,
             "videos_in_queue": 0,
             "clips_in_queue": 0,
         }
-        for src, dst in required.items():
-            if src in row_map:
-                out[dst] = self._to_int_safe(row_map[src], 0)
-        return out
+
+    def _read_values(self, ws: Worksheet) -> List[List[str]]:
+        if self.mirror is not None:
+            return self.mirror.read(ws)
+        return self.gateway.read(ws.get_all_values)
 
     def _get_active_sheet_values(self, ws: Worksheet) -> Dict[str, int]:
-        values = ws.get_all_values()
+        if self.mirror is not None:
+            header, last = self.mirror.tail(ws)
+            if header is None or last is None:
+                return self._empty_metrics()
+            return self._extract_exact_metrics(self._get_headers_map(header, last))
+        # ошибки (в том числе лимит запросов) не глушим: полный скан в этот момент только удвоит нагрузку
+        tail = self._get_active_sheet_values_tail(ws)
+        if tail is not None:
+            return tail
+        return self._get_active_sheet_values_full(ws)
+
+    def _get_active_sheet_values_tail(self, ws: Worksheet) -> Optional[Dict[str, int]]:
+        """Метрики последней строки без выгрузки всего листа. Строка заголовка ищется по колонке A
+        и кэшируется на metadata_ttl; последняя строка — по колонкам метрик и A одним batch_get,
+        из него же берутся значения. None — нужен полный скан."""
+        cached = self._headers_cache.get(ws.id)
+        col_index = self._cached_header_index(ws, cached["row"]) if cached else None
+        if col_index is not None:
+            hdr_row = cached["row"]
+        else:
+            probe = [[v] for v in self.gateway.read(ws.col_values, 1)]
+            hdr_idx = self._first_non_empty_row(probe)
+            if hdr_idx is None:
+                return None
+            hdr_row = hdr_idx + 1
+            headers_raw = self.gateway.read(ws.row_values, hdr_row)
+            if not any(str(h).strip() for h in headers_raw):
+                return None
+            col_index = self._header_index(headers_raw)
+            self._headers_cache[ws.id] = {"row": hdr_row, "index": col_index, "at": time.monotonic()}
+
+        cols = sorted({0} | {col_index[src] for src in self.METRIC_COLUMNS if src in col_index})
+        ranges = [f"{self._col_letter(c)}{hdr_row + 1}:{self._col_letter(c)}" for c in cols]
+        columns = self.gateway.read(ws.batch_get, ranges)
+        by_col = {c: [(cell[0] if cell else "") for cell in rng] for c, rng in zip(cols, columns)}
+        # последняя строка — самая нижняя непустая хотя бы в одной из колонок, а не только в A
+        last = max(
+            (i for vals in by_col.values() for i in range(len(vals)) if str(vals[i]).strip()),
+            default=None,
+        )
+        if last is None:
+            return self._empty_metrics()
+        row_values = [""] * (cols[-1] + 1)
+        for c, vals in by_col.items():
+            row_values[c] = vals[last] if last < len(vals) else ""
+        return self._extract_indexed_metrics(col_index, row_values)
+
+    @staticmethod
+    def _col_letter(index: int) -> str:
+        """0 -> A, 25 -> Z, 26 -> AA."""
+        letters = ""
+        index += 1
+        while index:
+            index, rem = divmod(index - 1, 26)
+            letters = chr(ord("A") + rem) + letters
+        return letters
+
+    def _get_active_sheet_values_full(self, ws: Worksheet) -> Dict[str, int]:
+        return self._metrics_from_values(self.gateway.read(ws.get_all_values))
+
+    def _metrics_from_values(self, values: List[List[str]]) -> Dict[str, int]:
         if not values:
-            return {
-                "videos_processed": 0,
-                "clips_processed": 0,
-                "videos_in_queue": 0,
-                "clips_in_queue": 0,
-            }
+            return self._empty_metrics()
         hdr_idx = self._first_non_empty_row(values)
         if hdr_idx is None:
-            return {
-                "videos_processed": 0,
-                "clips_processed": 0,
-                "videos_in_queue": 0,
-                "clips_in_queue": 0,
-            }
+            return self._empty_metrics()
         headers_raw = values[hdr_idx]
         last_idx = self._last_non_empty_row(values[hdr_idx + 1:])
         if last_idx is None:
-            return {
-                "videos_processed": 0,
-                "clips_processed": 0,
-                "videos_in_queue": 0,
-                "clips_in_queue": 0,
-            }
+            return self._empty_metrics()
         row_values = values[hdr_idx + 1 + last_idx]
         row_map = self._get_headers_map(headers_raw, row_values)
         return self._extract_exact_metrics(row_map)
@@ -132,12 +296,19 @@ class worksheetExtractor:
     def _get_agent_core_stats(
         self,
         *,
-        header_row: int = 1,
-        drop_empty: bool = True
+        header_row: Optional[int] = 1,
+        drop_empty: bool = True,
+        ws: Optional[Worksheet] = None
     ) -> pd.DataFrame:
-        values = self.ws.get_all_values()
+        """header_row — номер строки заголовка (с 1); None — первая непустая строка, как в /stat."""
+        values = self._read_values(ws or self.ws)
         if not values:
             return pd.DataFrame()
+        if header_row is None:
+            hdr_idx = self._first_non_empty_row(values)
+            if hdr_idx is None:
+                return pd.DataFrame()
+            header_row = hdr_idx + 1
         if header_row and header_row > 0:
             hdr_idx = header_row - 1
             if hdr_idx >= len(values):
@@ -151,9 +322,268 @@ class worksheetExtractor:
             df = df.dropna(how="all").dropna(axis=1, how="all")
         return df
 
+    TIME_HEADER_RE = re.compile(r"date|time|timestamp|дата|время", re.IGNORECASE)
+
+    def _vectorize_metrics(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Числовые колонки метрик целиком: извлечение числа регуляркой + to_numeric по всей колонке
+        (то же правило, что _to_int_safe, но без цикла по ячейкам). Колонка 'ts' — время строки, если есть."""
+        df = df.loc[:, [c for c in df.columns if str(c).strip()]]
+        df.columns = [str(c).strip() for c in df.columns]
+        out = pd.DataFrame(index=df.index)
+        for src, dst in self.METRIC_COLUMNS.items():
+            if src not in df.columns:
+                continue
+            col = df[src]
+            if isinstance(col, pd.DataFrame):
+                col = col.iloc[:, -1]
+            digits = col.astype(str).str.replace(r"\s", "", regex=True).str.extract(r"(-?\d+)", expand=False)
+            out[dst] = pd.to_numeric(digits, errors="coerce")
+        time_cols = [c for c in df.columns if self.TIME_HEADER_RE.search(c)]
+        if time_cols:
+            out["ts"] = pd.to_datetime(df[time_cols[0]].replace("", pd.NA), errors="coerce", dayfirst=True)
+        metric_cols = [c for c in out.columns if c != "ts"]
+        if not metric_cols:
+            return out.iloc[0:0]
+        return out.dropna(subset=metric_cols, how="all")
+
+    def get_throughput_analytics(
+        self, sheet_name: str = "stat", window_hours: float = 24.0, window_rows: int = 24
+    ) -> Dict[str, Any]:
+        """Пропускная способность агента по истории листа: клипы/видео в час, скорость разбора
+        очереди и оценка времени до её опустошения. Без колонки времени окно — последние
+        window_rows строк, а скорости считаются на запуск (строку), а не в час."""
+        ws = self._get_sheet(sheet_name)
+        raw = self._get_agent_core_stats(ws=ws, header_row=None)
+        df = self._vectorize_metrics(raw) if not raw.empty else raw
+        res: Dict[str, Any] = {"rows": int(len(df)), "timed": False}
+        if self.mirror is not None:
+            # история целиком: правки старых строк видны только после полной сверки зеркала
+            res["age"] = int(self.mirror.age(ws, whole=True) or 0)
+        if len(df) < 2:
+            return res
+
+        if "ts" in df.columns and df["ts"].notna().sum() >= 2:
+            df = df.dropna(subset=["ts"]).sort_values("ts")
+            cutoff = df["ts"].iloc[-1] - pd.Timedelta(hours=window_hours)
+            window = df[df["ts"] >= cutoff]
+            if len(window) < 2:
+                window = df.iloc[-2:]
+            span = (window["ts"].iloc[-1] - window["ts"].iloc[0]).total_seconds() / 3600
+            res["timed"] = True
+            res["span_hours"] = span
+            if "clips_processed" in window.columns:
+                hourly = window.set_index("ts")["clips_processed"].resample("1h").max().ffill().diff().dropna()
+                res["clips_hourly_peak"] = float(hourly.max()) if not hourly.empty else None
+        else:
+            window = df.iloc[-int(max(2, window_rows)):]
+            span = float(len(window) - 1)
+            res["window_rows"] = int(len(window))
+        if span <= 0:
+            return res
+
+        first, last = window.iloc[0], window.iloc[-1]
+
+        def rate(col: str) -> Optional[float]:
+            if col not in window.columns or pd.isna(first[col]) or pd.isna(last[col]):
+                return None
+            return float(last[col] - first[col]) / span
+
+        res["clips_per_unit"] = rate("clips_processed")
+        res["videos_per_unit"] = rate("videos_processed")
+        queue_delta = rate("clips_in_queue")
+        res["queue_drain_per_unit"] = -queue_delta if queue_delta is not None else None
+        res["clips_in_queue"] = int(last["clips_in_queue"]) if "clips_in_queue" in window.columns and pd.notna(last["clips_in_queue"]) else None
+
+        # ETA считаем по фактической выработке клипов, если очередь растёт — по скорости разбора не получится
+        speed = res["queue_drain_per_unit"] if (res["queue_drain_per_unit"] or 0) > 0 else res["clips_per_unit"]
+        if res["clips_in_queue"] is not None and speed and speed > 0:
+            res["backlog_eta_units"] = res["clips_in_queue"] / speed
+        return res
+
+    async def get_throughput_analytics_async(
+        self, sheet_name: str = "stat", window_hours: float = 24.0, window_rows: int = 24
+    ) -> Dict[str, Any]:
+        return await self.gateway.run(
+            self.get_throughput_analytics, sheet_name, window_hours, window_rows,
+            key=("analytics", sheet_name, window_hours, window_rows),
+        )
+
     def get_info_metrics(self, sheet_name: str = "stst") -> Dict[str, int]:
         try:
             ws = self._get_sheet(sheet_name)
         except WorksheetNotFound as e:
             raise RuntimeError(f"Лист '{sheet_name}' не найден: {e}")
-        return self._get_active_sheet_values(ws)
+        metrics = self._get_active_sheet_values(ws)
+        if self.mirror is not None:
+            metrics["age"] = int(self.mirror.age(ws) or 0)
+        return metrics
+
+    async def get_info_metrics_async(self, sheet_name: str = "stst") -> Dict[str, int]:
+        return await self.gateway.run(self.get_info_metrics, sheet_name, key=("info", sheet_name))
+
+    def append_description(
+        self,
+        *,
+        description: str,
+        video_url: Optional[str],
+        chat_id: int,
+        timestamp_iso: str,
+        sheet_name: str = "Descriptions"
+    ) -> int:
+        """Кладёт строку в буфер (со spool-файлом); в Sheets она уйдёт пачкой через append_rows.
+        Возвращает число строк, ожидающих записи."""
+        pending = self._spool_description(description, video_url, chat_id, timestamp_iso, sheet_name)
+        self._wake_flusher(pending)
+        return pending
+
+    async def append_description_async(
+        self,
+        *,
+        description: str,
+        video_url: Optional[str],
+        chat_id: int,
+        timestamp_iso: str,
+        sheet_name: str = "Descriptions"
+    ) -> int:
+        # запись в spool с fsync — блокирующий диск, его не место в event loop
+        pending = await run_blocking("disk", self._spool_description, description, video_url, chat_id, timestamp_iso, sheet_name)
+        self._wake_flusher(pending)
+        return pending
+
+    def _spool_description(
+        self, description: str, video_url: Optional[str], chat_id: int, timestamp_iso: str, sheet_name: str
+    ) -> int:
+        row = [timestamp_iso, chat_id, video_url or "", description]
+        return self._write_buffer.add(sheet_name, row, key=canonical_key(video_url) if video_url else None)
+
+    def _wake_flusher(self, pending: int) -> None:
+        if pending >= self.flush_batch:
+            self._flush_wakeup.set()
+
+    def _get_or_create_worksheet(self, name: str, header: List[str]) -> Worksheet:
+        try:
+            return self._get_worksheet_ci(name)
+        except WorksheetNotFound:
+            ws = self.gateway.write(self.sh.add_worksheet, title=name, rows=1000, cols=len(header))
+            self.gateway.write(ws.append_row, header, value_input_option="RAW")
+            self._refresh_worksheet_registry()
+            return ws
+
+    def _get_url_rows(self, ws: Worksheet) -> Dict[str, int]:
+        """Индекс ключ видео -> номер строки; строится одним чтением колонки video_url
+        и живёт metadata_ttl секунд, как кэш заголовков."""
+        name = (ws.title or "").strip().lower()
+        entry = self._url_rows.get(name)
+        if entry is not None and time.monotonic() - entry["at"] < self.metadata_ttl:
+            return entry["index"]
+        col = self.DESCRIPTION_COLUMNS.index("video_url") + 1
+        index: Dict[str, int] = {}
+        for row_no, url in enumerate(self.gateway.read(ws.col_values, col), start=1):
+            url = (url or "").strip()
+            if row_no > 1 and url:
+                index[canonical_key(url)] = row_no
+        self._url_rows[name] = {"at": time.monotonic(), "index": index}
+        return index
+
+    def _drop_url_rows(self, ws: Worksheet) -> None:
+        self._url_rows.pop((ws.title or "").strip().lower(), None)
+
+    def _rows_still_match(self, ws: Worksheet, updates: Dict[int, Dict[str, Any]]) -> bool:
+        """Строки могли сдвинуть (удаление, сортировка, вставка): проверяем одним batch_get,
+        что в каждой целевой строке всё ещё лежит то же видео."""
+        col = chr(ord("A") + self.DESCRIPTION_COLUMNS.index("video_url"))
+        rows = sorted(updates)
+        ranges = self.gateway.read(ws.batch_get, [f"{col}{row}" for row in rows])
+        for row, cells in zip(rows, ranges):
+            url = (cells[0][0] if cells and cells[0] else "").strip()
+            if not url or canonical_key(url) != updates[row]["key"]:
+                return False
+        return True
+
+    @staticmethod
+    def _plan_upsert(index: Dict[str, int], entries: List[Dict[str, Any]]):
+        """(обновления {строка: entry}, новые строки); повторы одного видео схлопываются в последнее."""
+        updates: Dict[int, Dict[str, Any]] = {}
+        appends: List[Dict[str, Any]] = []
+        pending_keys: Dict[str, int] = {}
+        for entry in entries:
+            key = entry.get("key")
+            if key and key in index:
+                updates[index[key]] = entry
+            elif key and key in pending_keys:
+                appends[pending_keys[key]] = entry
+            else:
+                if key:
+                    pending_keys[key] = len(appends)
+                appends.append(entry)
+        return updates, appends
+
+    @staticmethod
+    def _first_appended_row(resp: Any) -> Optional[int]:
+        rng = ((resp or {}).get("updates") or {}).get("updatedRange") or ""
+        m = re.search(r"![A-Z]+(\d+)", rng)
+        return int(m.group(1)) if m else None
+
+    def _upsert_rows(self, ws: Worksheet, entries: List[Dict[str, Any]]) -> None:
+        """Строки с уже известным video_url — точечный batch_update, остальные — один append_rows."""
+        index = self._get_url_rows(ws)
+        updates, appends = self._plan_upsert(index, entries)
+        if updates and not self._rows_still_match(ws, updates):
+            self._drop_url_rows(ws)
+            index = self._get_url_rows(ws)
+            updates, appends = self._plan_upsert(index, entries)
+
+        last_col = chr(ord("A") + len(self.DESCRIPTION_COLUMNS) - 1)
+        if updates:
+            self.gateway.write(
+                ws.batch_update,
+                [{"range": f"A{row}:{last_col}{row}", "values": [e["values"]]} for row, e in updates.items()],
+                value_input_option="RAW",
+            )
+        if appends:
+            resp = self.gateway.write(ws.append_rows, [e["values"] for e in appends], value_input_option="RAW")
+            first = self._first_appended_row(resp)
+            if first is None:
+                self._drop_url_rows(ws)
+                return
+            for offset, entry in enumerate(appends):
+                if entry.get("key"):
+                    index[entry["key"]] = first + offset
+
+    def flush_descriptions(self) -> int:
+        with self._flush_thread_lock:
+            return self._flush_descriptions()
+
+    def _flush_descriptions(self) -> int:
+        count, entries = self._write_buffer.peek()
+        if not count:
+            return 0
+        by_sheet: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for entry in entries:
+            by_sheet[entry["sheet"]].append(entry)
+        for sheet_name, sheet_entries in by_sheet.items():
+            ws = self._get_or_create_worksheet(sheet_name, self.DESCRIPTION_COLUMNS)
+            self._upsert_rows(ws, sheet_entries)
+        self._write_buffer.commit(count)
+        return count
+
+    async def flush_descriptions_async(self) -> int:
+        async with self._flush_lock:
+            return await self.gateway.run(self.flush_descriptions, write=True)
+
+    async def run_description_flusher(self) -> None:
+        """Фоновый сброс буфера по размеру (flush_batch) или по времени (flush_interval)."""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            if not self._write_buffer.pending:
+                continue
+            if self._write_buffer.pending < self.flush_batch and self._write_buffer.oldest_age() < self.flush_interval:
+                continue
+            try:
+                await self.flush_descriptions_async()
+            except Exception as e:
+                print(f"[sheets] не удалось записать описания, повтор позже: {e}")
@@ -1,38 +1,312 @@
 import json
+import asyncio
+import threading
+from collections import OrderedDict
 import pandas as pd
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Iterable, Set
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from datetime import datetime, timezone, timedelta
 
+from managers.ttlCache import ttlCache
+from managers.blockingExecutor import run_blocking
+from managers.quotaLedger import quotaLedger
+
 class youtubeExtractor:
-    def __init__(self, api_key : str = None) -> None:
+    RECENT_STRATEGIES = ('playlist', 'search')
+    CHANNELS_BATCH = 50
+    CONDITIONAL_METHODS = ('channels.list', 'playlistItems.list')
+    ETAG_CACHE_SIZE = 512
+
+    def __init__(
+        self,
+        api_key : str = None,
+        recent_strategy : str = 'playlist',
+        stats_ttl : float = 300.0,
+        stats_max_stale : float = 3600.0,
+        channel_ids : Optional[List[str]] = None,
+        quota : Optional[quotaLedger] = None
+    ) -> None:
         if api_key is None:
             raise ValueError('No YouTube API key provided')
-        
+        if recent_strategy not in self.RECENT_STRATEGIES:
+            raise ValueError(f'Unknown recent_strategy: {recent_strategy}')
+
         self.api_key = api_key
-        self.youtube = build('youtube', 'v3', developerKey = self.api_key, cache_discovery=False)
+        self.recent_strategy = recent_strategy
+        self._uploads_playlists: Dict[str, str] = {}
+        self._stats_cache = ttlCache(ttl = stats_ttl, max_stale = stats_max_stale)
+        self._stats_refreshing: Dict[str, asyncio.Task] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._batch_refreshing: set = set()
+        self.channel_ids = [c for c in (channel_ids or []) if c]
+        self._local = threading.local()
+        self.quota = quota or quotaLedger()
+        self._etags: OrderedDict = OrderedDict()
+        self._etags_lock = threading.Lock()
+        self.status = 'not initialized'
 
         self.view_count = None
         self.subscriber_count = None
         self.video_count = None
         self.videos_last_24h = None
 
+    @property
+    def youtube(self):
+        # httplib2 внутри googleapiclient не потокобезопасен — свой клиент на каждый поток пула
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            try:
+                client = build('youtube', 'v3', developerKey = self.api_key, cache_discovery=False)
+            except Exception as e:
+                self.status = f'error: {e}'
+                raise
+            self._local.client = client
+            self.status = 'ready'
+        return client
+
+    async def warm_up_async(self) -> str:
+        try:
+            await run_blocking('youtube', lambda: self.youtube)
+        except Exception:
+            pass
+        return self.status
+
+    def _execute(self, method: str, request):
+        """execute() с учётом квоты; для каналов и плейлистов — условный запрос по ETag.
+        На 304 Not Modified возвращается ранее полученное тело ответа."""
+        self.quota.spend(method)
+        if method not in self.CONDITIONAL_METHODS:
+            return request.execute()
+
+        key = request.uri
+        with self._etags_lock:
+            cached = self._etags.get(key)
+            if cached is not None:
+                self._etags.move_to_end(key)
+        if cached is not None:
+            request.headers['If-None-Match'] = cached[0]
+        try:
+            resp = request.execute()
+        except HttpError as e:
+            if cached is not None and getattr(e.resp, 'status', None) == 304:
+                return cached[1]
+            raise
+        etag = resp.get('etag')
+        if etag:
+            with self._etags_lock:
+                self._etags[key] = (etag, resp)
+                self._etags.move_to_end(key)
+                while len(self._etags) > self.ETAG_CACHE_SIZE:
+                    self._etags.popitem(last = False)
+        return resp
+
+    async def get_channel_stats(self, channel_id: str) -> Optional[Dict]:
+        """Статистика канала из кэша: свежая — сразу, устаревшая — сразу + фоновое обновление.
+        В ответ добавляется 'age' — возраст данных в секундах."""
+        hit = self._stats_cache.get(channel_id)
+        if hit is not None:
+            data, age = hit
+            # при подходе к лимиту квоты отдаём кэш как есть, без фонового обновления
+            if not self._stats_cache.is_fresh(age) and self.quota.level() == 'ok':
+                self._refresh_channel_stats(channel_id)
+            return {**data, 'age': age}
+        if self.quota.level() == 'exhausted':
+            raise RuntimeError('квота YouTube API исчерпана, кэша нет')
+        data = await asyncio.shield(self._refresh_channel_stats(channel_id))
+        if data is None:
+            return None
+        return {**data, 'age': 0.0}
+
+    def _refresh_channel_stats(self, channel_id: str) -> asyncio.Task:
+        task = self._stats_refreshing.get(channel_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._fetch_channel_stats(channel_id))
+            self._stats_refreshing[channel_id] = task
+            self._track_background(task)
+        return task
+
+    def _track_background(self, task: asyncio.Task) -> None:
+        # держим ссылку до завершения, иначе фоновую задачу может собрать GC
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_done)
+
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            print(f'[youtube] фоновое обновление статистики не удалось, отдаётся кэш: {exc}')
+
+    async def _fetch_channel_stats(self, channel_id: str) -> Optional[Dict]:
+        try:
+            raw = await run_blocking('youtube', self._get_channel_core_stats, channel_id)
+        finally:
+            self._stats_refreshing.pop(channel_id, None)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        self._stats_cache.set(channel_id, data)
+        return data
+
+    async def get_channels_stats(self, channel_ids: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Статистика нескольких каналов: промахи кэша добираются батчем channels.list (до 50 ID),
+        устаревшие значения отдаются сразу и обновляются в фоне."""
+        out: Dict[str, Optional[Dict]] = {}
+        missing, stale = [], []
+        for cid in dict.fromkeys(channel_ids):
+            hit = self._stats_cache.get(cid)
+            if hit is None:
+                missing.append(cid)
+                continue
+            data, age = hit
+            out[cid] = {**data, 'age': age}
+            if not self._stats_cache.is_fresh(age) and cid not in self._batch_refreshing and self.quota.level() == 'ok':
+                stale.append(cid)
+        if stale:
+            self._track_background(asyncio.create_task(self._fetch_channels_stats(stale)))
+        if missing:
+            if self.quota.level() == 'exhausted':
+                raise RuntimeError('квота YouTube API исчерпана, кэша нет')
+            fetched = await self._fetch_channels_stats(missing)
+            for cid in missing:
+                data = fetched.get(cid)
+                out[cid] = {**data, 'age': 0.0} if data else None
+        return out
+
+    async def _fetch_channels_stats(self, channel_ids: List[str]) -> Dict[str, Dict]:
+        self._batch_refreshing.update(channel_ids)
+        try:
+            core = await run_blocking('youtube', self._get_channels_core_stats_batch, channel_ids)
+            counts = await asyncio.gather(
+                *[run_blocking('youtube', self._count_videos_last_24h, cid) for cid in core],
+                return_exceptions=True
+            )
+        finally:
+            self._batch_refreshing.difference_update(channel_ids)
+        result = {}
+        for cid, count in zip(core, counts):
+            data = {**core[cid], 'videos_last_24h': None if isinstance(count, Exception) else count}
+            self._stats_cache.set(cid, data)
+            result[cid] = data
+        return result
+
+    def _get_channels_core_stats_batch(self, channel_ids: List[str]) -> Dict[str, Dict]:
+        out: Dict[str, Dict] = {}
+        for i in range(0, len(channel_ids), self.CHANNELS_BATCH):
+            chunk = channel_ids[i:i + self.CHANNELS_BATCH]
+            resp = self._execute('channels.list', self.youtube.channels().list(
+                id = ','.join(chunk),
+                part = 'snippet,statistics,contentDetails',
+                maxResults = self.CHANNELS_BATCH
+            ))
+            for item in resp.get('items', []):
+                cid = item.get('id')
+                statistics = item.get('statistics', {})
+                uploads = item.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+                if uploads:
+                    self._uploads_playlists[cid] = uploads
+                out[cid] = {
+                    'title' : item.get('snippet', {}).get('title', cid),
+                    'views' : int(statistics.get('viewCount', 0)),
+                    'subs' : int(statistics.get('subscriberCount', 0)),
+                    'videos' : int(statistics.get('videoCount', 0)),
+                }
+        return out
+
+    async def get_top_clips(self, channel_id: str, *, hours: int = 72, limit: int = 10, max_items: int = 500) -> List[Dict]:
+        return await run_blocking('youtube', self._get_top_clips, channel_id, hours, limit, max_items)
+
+    def _get_top_clips(self, channel_id: str, hours: int, limit: int, max_items: int) -> List[Dict]:
+        """Свежие загрузки канала, отсортированные по просмотрам в час с момента публикации.
+        Стоимость: страница playlistItems.list + videos.list на каждые 50 видео."""
+        uploads = self._get_recent_uploads(channel_id, hours = hours, max_items = max_items)
+        now = datetime.now(timezone.utc)
+        report = []
+        for video_id, st in self._get_videos_stats([vid for vid, _ in uploads]).items():
+            published = st['published_at']
+            age_hours = max((now - published).total_seconds() / 3600, 1 / 60)
+            report.append({
+                **st,
+                'video_id' : video_id,
+                'age_hours' : age_hours,
+                'views_per_hour' : st['views'] / age_hours,
+            })
+        report.sort(key = lambda r: r['views_per_hour'], reverse = True)
+        return report[:limit]
+
+    def _get_recent_uploads(self, channel_id: str, *, hours: int, max_items: int) -> List[tuple]:
+        playlist_id = self._get_uploads_playlist_id(channel_id)
+        if not playlist_id:
+            return []
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+
+        out = []
+        page_token = None
+        while len(out) < max_items:
+            resp = self._execute('playlistItems.list', self.youtube.playlistItems().list(
+                playlistId=playlist_id,
+                part='contentDetails',
+                maxResults=50,
+                pageToken=page_token
+            ))
+            reached_cutoff = False
+            for item in resp.get('items', []):
+                details = item.get('contentDetails', {})
+                published = details.get('videoPublishedAt')
+                if not published or not details.get('videoId'):
+                    continue
+                published_at = datetime.fromisoformat(published.replace('Z', '+00:00'))
+                if published_at < cutoff:
+                    reached_cutoff = True
+                    break
+                out.append((details['videoId'], published_at))
+            page_token = resp.get('nextPageToken')
+            if reached_cutoff or not page_token:
+                break
+        return out[:max_items]
+
+    def _get_videos_stats(self, video_ids: List[str]) -> Dict[str, Dict]:
+        out: Dict[str, Dict] = {}
+        for i in range(0, len(video_ids), self.CHANNELS_BATCH):
+            chunk = video_ids[i:i + self.CHANNELS_BATCH]
+            resp = self._execute('videos.list', self.youtube.videos().list(
+                id = ','.join(chunk),
+                part = 'snippet,statistics',
+                maxResults = self.CHANNELS_BATCH
+            ))
+            for item in resp.get('items', []):
+                snippet = item.get('snippet', {})
+                statistics = item.get('statistics', {})
+                out[item['id']] = {
+                    'title' : snippet.get('title', ''),
+                    'published_at' : datetime.fromisoformat(snippet['publishedAt'].replace('Z', '+00:00')),
+                    'views' : int(statistics.get('viewCount', 0)),
+                    'likes' : int(statistics.get('likeCount', 0)),
+                    'comments' : int(statistics.get('commentCount', 0)),
+                }
+        return out
+
     def _get_channel_core_stats(self, channel_id: str) -> Optional[Dict]:
-        resp = self.youtube.channels().list(
+        resp = self._execute('channels.list', self.youtube.channels().list(
             id = channel_id,
-            part = 'snippet,statistics'
-        ).execute()
+            part = 'snippet,statistics,contentDetails'
+        ))
 
         items = resp.get('items', [])
         if not items:
             return None
 
         statistics = items[0].get('statistics', {})
-        
+        uploads = items[0].get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+        if uploads:
+            self._uploads_playlists[channel_id] = uploads
+
         self.view_count = int(statistics.get('viewCount', 0))
         self.subscriber_count = int(statistics.get('subscriberCount', 0))
         self.video_count = int(statistics.get('videoCount', 0))
-        self.videos_last_24h = self._count_videos_last_24h_search(channel_id)
+        self.videos_last_24h = self._count_videos_last_24h(channel_id)
 
         data = {
             'views' : self.view_count,
@@ -43,6 +317,58 @@ class youtubeExtractor:
         
         return json.dumps(data, ensure_ascii = False, indent = 4)
 
+    def _count_videos_last_24h(self, channel_id: str) -> int:
+        if self.recent_strategy == 'search' and self.quota.level() == 'ok':
+            return self._count_videos_last_24h_search(channel_id)
+        return self._count_videos_last_24h_playlist(channel_id)
+
+    def _get_uploads_playlist_id(self, channel_id: str) -> Optional[str]:
+        if channel_id in self._uploads_playlists:
+            return self._uploads_playlists[channel_id]
+        # плейлист загрузок канала UCxxxx всегда UUxxxx — без лишнего запроса
+        if channel_id.startswith('UC'):
+            self._uploads_playlists[channel_id] = 'UU' + channel_id[2:]
+            return self._uploads_playlists[channel_id]
+        resp = self._execute('channels.list', self.youtube.channels().list(id = channel_id, part = 'contentDetails'))
+        items = resp.get('items', [])
+        if not items:
+            return None
+        uploads = items[0].get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+        if uploads:
+            self._uploads_playlists[channel_id] = uploads
+        return uploads
+
+    def _count_videos_last_24h_playlist(self, channel_id: str) -> int:
+        """playlistItems.list стоит 1 единицу квоты за страницу против 100 у search.list.
+        Плейлист загрузок отсортирован от новых к старым, поэтому листаем до первой записи старше 24 ч."""
+        playlist_id = self._get_uploads_playlist_id(channel_id)
+        if not playlist_id:
+            return 0
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+
+        total = 0
+        page_token = None
+        while True:
+            resp = self._execute('playlistItems.list', self.youtube.playlistItems().list(
+                playlistId=playlist_id,
+                part='contentDetails',
+                maxResults=50,
+                pageToken=page_token
+            ))
+            reached_cutoff = False
+            for item in resp.get('items', []):
+                published = item.get('contentDetails', {}).get('videoPublishedAt')
+                if not published:
+                    continue
+                if datetime.fromisoformat(published.replace('Z', '+00:00')) < cutoff:
+                    reached_cutoff = True
+                    break
+                total += 1
+            page_token = resp.get('nextPageToken')
+            if reached_cutoff or not page_token:
+                break
+        return total
+
     def _count_videos_last_24h_search(self, channel_id: str) -> int:
         cutoff = (datetime.now(timezone.utc) - timedelta(hours=24))
         published_after = cutoff.isoformat().replace('+00:00', 'Z')
@@ -50,7 +376,7 @@ class youtubeExtractor:
         total = 0
         page_token = None
         while True:
-            resp = self.youtube.search().list(
+            resp = self._execute('search.list', self.youtube.search().list(
                 channelId=channel_id,
                 part='id',
                 type='video',
@@ -58,7 +384,7 @@ class youtubeExtractor:
                 publishedAfter=published_after,
                 maxResults=50,
                 pageToken=page_token
-            ).execute()
+            ))
             total += len(resp.get('items', []))
             page_token = resp.get('nextPageToken')
             if not page_token:
@@ -9,5 +9,18 @@ class apiCheckHandler(CommandHandler):
             if not self.auth.is_authorized(message.chat.id):
                 await message.reply("Доступ запрещён. Авторизуйся: /start <пароль>")
                 return
-            text = self.apis.health_human(fallback_channel_id=self.youtube_channel_id)
+            args = (message.text or "").split()[1:]
+            force = bool(args) and args[0].lower() in {"refresh", "обновить"}
+            if self.prober is None:
+                text = await self.apis.health_human(fallback_channel_id=self.youtube_channel_id)
+            else:
+                if force or not self.prober.ready:
+                    await self.prober.refresh()
+                text = self.prober.human()
+                if not force:
+                    text += "\n\nДанные фоновой проверки. Перепроверить сейчас: /api_check refresh"
+            text += "\n\n" + self.n8n.breakers_human()
+            text += "\n\n" + self.youtube.quota.human()
+            text += f"\n\nКлиенты Google: YouTube — {self.youtube.status}, Sheets — {self.worksheet.status}"
+            text += "\n" + self.worksheet.gateway.human()
             await message.reply(text)
\ No newline at end of file
@@ -1,21 +1,115 @@
+import csv
+import io
+import re
+from datetime import datetime
 from pyrogram import filters
 from commandHandler import CommandHandler
 
 
 class enqueueHandler(CommandHandler):
+    MAX_FILE_SIZE = 5 * 1024 * 1024
+    _SPLIT_RE = re.compile(r"[\s,;]+")
+
     def register(self):
-        @self.app.on_message(filters.command("enqueue"))
+        @self.app.on_message(filters.command(["enqueue", "enqueue_force"]))
         async def enqueue_handler(client, message):
             if not self.auth.is_authorized(message.chat.id):
                 await message.reply("Доступ запрещён. Авторизуйся: /start <пароль>")
                 return
-            args = message.text.split(maxsplit=1)
-            if len(args) < 2:
-                await message.reply("Используй: /enqueue <url>")
+            text = message.text or message.caption or ""
+            args = text.split(maxsplit=1)
+            # /enqueue_force — поставить повторно, минуя индекс уже отправленных видео
+            force = bool(args) and args[0].lstrip("/").split("@")[0].lower() == "enqueue_force"
+            candidates = self._split_tokens(args[1]) if len(args) > 1 else []
+
+            if message.document:
+                name = (message.document.file_name or "").lower()
+                if not name.endswith((".txt", ".csv")):
+                    await message.reply("Поддерживаются только .txt и .csv файлы со ссылками.")
+                    return
+                if (message.document.file_size or 0) > self.MAX_FILE_SIZE:
+                    await message.reply("Файл слишком большой (максимум 5 МБ).")
+                    return
+                buf = await message.download(in_memory=True)
+                buf.seek(0)
+                candidates += list(self._iter_document_tokens(buf))
+
+            if not candidates:
+                await message.reply("Используй: /enqueue <url> [url ...] или пришли .txt/.csv файл с подписью /enqueue\n"
+                                    "Повторно, минуя проверку дубликатов: /enqueue_force <url>")
                 return
-            url_to_enqueue = args[1].strip()
-            if not self._is_valid_url(url_to_enqueue):
+
+            valid = [c for c in candidates if self._is_valid_url(c)]
+            invalid = len(candidates) - len(valid)
+            urls = list(dict.fromkeys(valid))
+            if not urls:
                 await message.reply("Некорректный URL. Нужен http(s)://...")
                 return
-            note = await self.n8n.trigger_enqueue(message.chat.id, url_to_enqueue)
-            await message.reply(note)
\ No newline at end of file
+
+            dups = []
+            if not force:
+                # ключи занимаются сразу, до отправки: параллельный /enqueue того же видео увидит дубликат
+                urls, dups = self.n8n.videos.reserve(urls, message.chat.id)
+            if not urls:
+                await message.reply(self._dups_report(dups))
+                return
+
+            if len(urls) == 1 and not invalid and not dups:
+                note = await self.n8n.trigger_enqueue(message.chat.id, urls[0], reserved=not force)
+                await message.reply(note)
+                return
+
+            await self._enqueue_bulk(message, urls, invalid, dups, reserved=not force)
+
+    async def _enqueue_bulk(self, message, urls: list, invalid: int, dups: list, reserved: bool = True):
+        size = self.n8n.enqueue_batch_size
+        total = len(urls)
+        counts = {"sent": 0, "queued": 0, "failed": 0}
+        last_note = ""
+        progress = await message.reply(f"⏳ Ставлю в очередь {total} ссылок…")
+        for i in range(0, total, size):
+            batch = urls[i:i + size]
+            status, note = await self.n8n.trigger_enqueue_batch(message.chat.id, batch, reserved=reserved)
+            counts[status] += len(batch)
+            if status != "sent":
+                last_note = note
+            done = min(i + size, total)
+            if done < total:
+                await progress.edit_text(f"⏳ Ставлю в очередь: {done}/{total}")
+
+        lines = [f"Готово: {total} ссылок."]
+        lines.append(f"• Отправлено в n8n: {counts['sent']}")
+        if counts["queued"]:
+            lines.append(f"• Сохранено для повторной отправки: {counts['queued']}")
+        if counts["failed"]:
+            lines.append(f"• Не отправлено: {counts['failed']}")
+        if invalid:
+            lines.append(f"• Пропущено некорректных строк: {invalid}")
+        if dups:
+            lines.append(f"• Пропущено дубликатов: {len(dups)}")
+        if last_note:
+            lines.append("")
+            lines.append(last_note)
+        await progress.edit_text("\n".join(lines))
+
+    @staticmethod
+    def _dups_report(dups: list, limit: int = 10) -> str:
+        lines = ["Эти видео уже были поставлены в очередь:"]
+        for url, first_seen in dups[:limit]:
+            when = datetime.fromtimestamp(first_seen).strftime("%Y-%m-%d %H:%M") if first_seen else "в этом же сообщении"
+            lines.append(f"• {url} — {when}")
+        if len(dups) > limit:
+            lines.append(f"… и ещё {len(dups) - limit}")
+        lines.append("Отправить повторно: /enqueue_force <url>")
+        return "\n".join(lines)
+
+    @classmethod
+    def _split_tokens(cls, text: str) -> list:
+        return [t for t in cls._SPLIT_RE.split(text or "") if t]
+
+    @classmethod
+    def _iter_document_tokens(cls, buf):
+        stream = io.TextIOWrapper(buf, encoding="utf-8", errors="ignore", newline="")
+        for row in csv.reader(stream):
+            for cell in row:
+                yield from cls._split_tokens(cell)
@@ -25,11 +25,11 @@ class setDescriptionHandler(CommandHandler):
                     description = p2.strip()
 
             ts = datetime.now(timezone.utc).isoformat()
-            self.worksheet.append_description(
+            pending = await self.worksheet.append_description_async(
                 description=description,
                 video_url=video_url,
                 chat_id=message.chat.id,
                 timestamp_iso=ts,
                 sheet_name="Descriptions",
             )
-            await message.reply("Описание сохранено в Google Sheets")
\ No newline at end of file
+            await message.reply(f"Описание сохранено и будет записано в Google Sheets (в очереди: {pending})")
\ No newline at end of file
@@ -10,7 +10,7 @@ class startHandler(CommandHandler):
             already = self.auth.is_authorized(message.chat.id)
 
             if already:
-                await message.reply("Вы уже авторизованы. Команды: /start_pipeline /stat /enqueue /autorun /autostop /set_description /api /api_check")
+                await message.reply("Вы уже авторизованы. Команды: /start_pipeline /stat /stat_history /enqueue /enqueue_force /autorun /autostop /set_description /top /api /api_check")
                 return
 
             if len(parts) == 2:
@@ -20,7 +20,7 @@ class startHandler(CommandHandler):
                 except Exception:
                     pass
                 if ok:
-                    await message.reply("Авторизация успешна. Команды: /start_pipeline /stat /enqueue /autorun /autостоп /set_description /api /api_check")
+                    await message.reply("Авторизация успешна. Команды: /start_pipeline /stat /stat_history /enqueue /enqueue_force /autorun /autостоп /set_description /top /api /api_check")
                 else:
                     await message.reply("Неверный пароль. Отправь: /start <пароль>")
                 return
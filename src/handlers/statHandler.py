@@ -1,3 +1,4 @@
+from datetime import datetime
 from pyrogram import filters
 from commandHandler import CommandHandler
 
@@ -10,36 +11,39 @@ class statHandler(CommandHandler):
                 await message.reply("Доступ запрещён. Авторизуйся: /start <пароль>")
                 return
 
+            args = message.text.split()
+            detail = len(args) > 1 and args[1].lower() in ("detail", "подробно")
             errors = []
             lines = []
             fmt = lambda n: f"{int(n):,}".replace(",", " ")
 
+            snapshot = {}
             yt_ok = False
             yt_block = []
             try:
-                yt_raw = self.youtube._get_channel_core_stats(self.youtube_channel_id)
-                if yt_raw is None:
-                    raise RuntimeError("данные YouTube пустые")
-                if isinstance(yt_raw, str):
-                    import json as _json
-                    yt = _json.loads(yt_raw)
-                elif isinstance(yt_raw, dict):
-                    yt = yt_raw
+                if len(self.youtube.channel_ids) > 1:
+                    block, totals = await self._channels_block(fmt)
+                    yt_block += block
+                    snapshot.update(totals)
                 else:
-                    raise RuntimeError("неожиданный формат ответа YouTube")
-
-                views = yt.get("views")
-                subs = yt.get("subs")
-                videos = yt.get("videos")
-                last24 = yt.get("videos_last_24h")
-
-                yt_block += [
-                    "📺 YouTube:",
-                    f"• Просмотры: {fmt(views) if views is not None else '—'}",
-                    f"• Подписчики: {fmt(subs) if subs is not None else '—'}",
-                    f"• Видео на канале: {fmt(videos) if videos is not None else '—'}",
-                    f"• Видео за 24 часа: {fmt(last24) if last24 is not None else '—'}",
-                ]
+                    yt = await self.youtube.get_channel_stats(self.youtube_channel_id)
+                    if yt is None:
+                        raise RuntimeError("данные YouTube пустые")
+
+                    views = yt.get("views")
+                    subs = yt.get("subs")
+                    videos = yt.get("videos")
+                    last24 = yt.get("videos_last_24h")
+                    snapshot.update(views=views, subs=subs, videos=videos, videos_last_24h=last24)
+
+                    yt_block += [
+                        "📺 YouTube:",
+                        f"• Просмотры: {fmt(views) if views is not None else '—'}",
+                        f"• Подписчики: {fmt(subs) if subs is not None else '—'}",
+                        f"• Видео на канале: {fmt(videos) if videos is not None else '—'}",
+                        f"• Видео за 24 часа: {fmt(last24) if last24 is not None else '—'}",
+                        f"• Обновлено: {self._age_human(yt.get('age', 0))}",
+                    ]
                 yt_ok = True
             except Exception as e:
                 errors.append(f"YouTube: {e}")
@@ -47,7 +51,8 @@ class statHandler(CommandHandler):
             gs_ok = False
             gs_block = []
             try:
-                info = self.worksheet.get_info_metrics(sheet_name="stat")
+                info = await self.worksheet.get_info_metrics_async(sheet_name="stat")
+                snapshot.update(info)
                 gs_block += [
                     "🤖 n8n Agent :",
                     f"• Видео обработано: {fmt(info.get('videos_processed', 0))}",
@@ -55,10 +60,18 @@ class statHandler(CommandHandler):
                     f"• Видео в очереди: {fmt(info.get('videos_in_queue', 0))}",
                     f"• Клипов в очереди: {fmt(info.get('clips_in_queue', 0))}",
                 ]
+                if "age" in info:
+                    gs_block.append(f"• Данные листа: {self._age_human(info['age'])}")
                 gs_ok = True
             except Exception as e:
                 errors.append(f"Google Sheets: {e}")
 
+            if self.history is not None and snapshot:
+                try:
+                    self.history.record(self._history_key(), snapshot)
+                except Exception as e:
+                    errors.append(f"История: {e}")
+
             if yt_ok:
                 lines += yt_block
             if gs_ok:
@@ -66,6 +79,23 @@ class statHandler(CommandHandler):
                     lines.append("")
                 lines += gs_block
 
+            if detail:
+                try:
+                    analytics = await self.worksheet.get_throughput_analytics_async(sheet_name="stat")
+                    block = self._analytics_block(analytics)
+                    if block:
+                        if lines:
+                            lines.append("")
+                        lines += block
+                except Exception as e:
+                    errors.append(f"Аналитика: {e}")
+
+            live = self._live_block(fmt)
+            if live:
+                if lines:
+                    lines.append("")
+                lines += live
+
             if errors:
                 if lines:
                     lines.append("")
@@ -77,4 +107,84 @@ class statHandler(CommandHandler):
                 await message.reply("❌ Не удалось получить статистику ни из YouTube, ни из Google Sheets.\n" + "\n".join(f"• {e}" for e in errors))
                 return
 
-            await message.reply("\n".join(lines))
\ No newline at end of file
+            await message.reply("\n".join(lines))
+
+    async def _channels_block(self, fmt) -> list:
+        stats = await self.youtube.get_channels_stats(self.youtube.channel_ids)
+        found = {cid: st for cid, st in stats.items() if st}
+        if not found:
+            raise RuntimeError("данные YouTube пустые")
+        total = lambda key: sum(st.get(key) or 0 for st in found.values())
+        totals = {key: total(key) for key in ("views", "subs", "videos", "videos_last_24h")}
+        oldest = max(st.get("age", 0) for st in found.values())
+        block = [
+            f"📺 YouTube ({len(found)} из {len(stats)} каналов):",
+            f"• Просмотры: {fmt(totals['views'])}",
+            f"• Подписчики: {fmt(totals['subs'])}",
+            f"• Видео на каналах: {fmt(totals['videos'])}",
+            f"• Видео за 24 часа: {fmt(totals['videos_last_24h'])}",
+            f"• Обновлено: {self._age_human(oldest)}",
+            "",
+            "По каналам:",
+        ]
+        for cid, st in stats.items():
+            if not st:
+                block.append(f"• {cid}: не найден")
+                continue
+            last24 = st.get("videos_last_24h")
+            block.append(
+                f"• {st.get('title', cid)}: {fmt(st['views'])} просм., {fmt(st['subs'])} подп., "
+                f"{fmt(st['videos'])} видео, за 24 ч: {fmt(last24) if last24 is not None else '—'}"
+            )
+        return block, totals
+
+    @classmethod
+    def _analytics_block(cls, res: dict) -> list:
+        if res.get("clips_per_unit") is None and res.get("videos_per_unit") is None:
+            return [f"📊 Аналитика: недостаточно истории ({res.get('rows', 0)} строк)"]
+        unit = "ч" if res.get("timed") else "запуск"
+        if res.get("timed"):
+            window = f"за {res.get('span_hours', 0):.1f} ч"
+        else:
+            window = f"последние {res.get('window_rows', 0)} запусков, колонки времени нет"
+        num = lambda v: "—" if v is None else f"{v:.1f}"
+        block = [
+            f"📊 Пропускная способность ({res.get('rows', 0)} строк истории, {window}):",
+            f"• Клипов в {unit}: {num(res.get('clips_per_unit'))}",
+            f"• Видео в {unit}: {num(res.get('videos_per_unit'))}",
+            f"• Разбор очереди клипов в {unit}: {num(res.get('queue_drain_per_unit'))}",
+        ]
+        if res.get("clips_hourly_peak") is not None:
+            block.append(f"• Пик за час: {num(res['clips_hourly_peak'])} клипов")
+        eta = res.get("backlog_eta_units")
+        if eta is not None:
+            block.append(f"• Очередь ({res['clips_in_queue']} клипов) будет разобрана примерно за {eta:.1f} {unit}")
+        if "age" in res:
+            block.append(f"• История сверена: {cls._age_human(res['age'])}")
+        return block
+
+    @staticmethod
+    def _age_human(age: float) -> str:
+        age = int(age or 0)
+        if age < 5:
+            return "только что"
+        if age < 60:
+            return f"{age} с назад"
+        if age < 3600:
+            return f"{age // 60} мин назад"
+        return f"{age // 3600} ч {age % 3600 // 60} мин назад"
+
+    def _live_block(self, fmt) -> list:
+        events = getattr(self.n8n, "events", None)
+        if events is None or not events.enabled or events.last_event_at is None:
+            return []
+        info = events.summary()
+        c = info["counters"]
+        last = datetime.fromtimestamp(info["last_event_at"]).strftime("%H:%M:%S")
+        return [
+            "⚡ События n8n (с запуска бота):",
+            f"• Задач в работе: {fmt(info['active_jobs'])}",
+            f"• Запущено: {fmt(c['started'])}, клипов нарезано: {fmt(c['clip_cut'])}",
+            f"• Опубликовано: {fmt(c['published'])}, ошибок: {fmt(c['failed'])}",
+            f"• Последнее событие: {last}",
+        ]
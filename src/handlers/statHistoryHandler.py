@@ -0,0 +1,56 @@
+from datetime import datetime
+from pyrogram import filters
+from commandHandler import CommandHandler
+
+
+class statHistoryHandler(CommandHandler):
+    LABELS = {
+        "views": ("Просмотры", "day"),
+        "subs": ("Подписчики", "day"),
+        "videos": ("Видео на канале", "day"),
+        "videos_processed": ("Видео обработано", "hour"),
+        "clips_processed": ("Клипов обработано", "hour"),
+        "videos_in_queue": ("Видео в очереди", "hour"),
+        "clips_in_queue": ("Клипов в очереди", "hour"),
+    }
+
+    def register(self):
+        @self.app.on_message(filters.command("stat_history"))
+        async def stat_history_handler(client, message):
+            if not self.auth.is_authorized(message.chat.id):
+                await message.reply("Доступ запрещён. Авторизуйся: /start <пароль>")
+                return
+            args = message.text.split()
+            hours = 24
+            if len(args) > 1:
+                try:
+                    hours = int(args[1])
+                except ValueError:
+                    await message.reply("Используй: /stat_history [часы]. Пример: /stat_history 72")
+                    return
+            if not (1 <= hours <= 24 * 365):
+                await message.reply("Допустимые значения: 1–8760 часов")
+                return
+
+            res = self.history.deltas(self._history_key(), hours)
+            if res is None:
+                await message.reply("Недостаточно данных: нужно минимум два снапшота /stat в этом окне.")
+                return
+
+            fmt = lambda n: f"{int(round(n)):,}".replace(",", " ")
+            sign = lambda n: ("+" if n > 0 else "") + fmt(n)
+            since = datetime.fromtimestamp(res["from_ts"]).strftime("%Y-%m-%d %H:%M")
+            until = datetime.fromtimestamp(res["to_ts"]).strftime("%Y-%m-%d %H:%M")
+            lines = [f"📈 Динамика {since} → {until} ({res['points']} снапшотов):"]
+            for metric, (label, unit) in self.LABELS.items():
+                m = res["metrics"].get(metric)
+                if m is None:
+                    continue
+                line = f"• {label}: {fmt(m['last'])} ({sign(m['delta'])})"
+                if m["per_hour"] is not None:
+                    if unit == "day":
+                        line += f", {m['per_hour'] * 24:+.1f}/день"
+                    else:
+                        line += f", {m['per_hour']:+.1f}/час"
+                lines.append(line)
+            await message.reply("\n".join(lines))
@@ -0,0 +1,45 @@
+from pyrogram import filters
+from commandHandler import CommandHandler
+
+
+class topHandler(CommandHandler):
+    def register(self):
+        @self.app.on_message(filters.command("top"))
+        async def top_handler(client, message):
+            if not self.auth.is_authorized(message.chat.id):
+                await message.reply("Доступ запрещён. Авторизуйся: /start <пароль>")
+                return
+            args = message.text.split()
+            hours, limit = 72, 10
+            try:
+                if len(args) > 1:
+                    hours = int(args[1])
+                if len(args) > 2:
+                    limit = int(args[2])
+            except ValueError:
+                await message.reply("Используй: /top [часы] [кол-во]. Пример: /top 48 15")
+                return
+            if not (1 <= hours <= 720) or not (1 <= limit <= 50):
+                await message.reply("Допустимо: часы 1–720, кол-во 1–50")
+                return
+
+            try:
+                clips = await self.youtube.get_top_clips(self.youtube_channel_id, hours=hours, limit=limit)
+            except Exception as e:
+                await message.reply(f"❌ YouTube: {e}")
+                return
+            if not clips:
+                await message.reply(f"За последние {hours} ч новых видео нет.")
+                return
+
+            fmt = lambda n: f"{int(n):,}".replace(",", " ")
+            lines = [f"🏆 Топ клипов за {hours} ч (просмотры в час):"]
+            for i, c in enumerate(clips, 1):
+                title = c["title"] if len(c["title"]) <= 60 else c["title"][:57] + "…"
+                lines.append(
+                    f"{i}. {title}\n"
+                    f"   {fmt(c['views_per_hour'])}/ч • 👁 {fmt(c['views'])} • 👍 {fmt(c['likes'])} • 💬 {fmt(c['comments'])} • "
+                    f"{c['age_hours']:.0f} ч назад\n"
+                    f"   https://youtu.be/{c['video_id']}"
+                )
+            await message.reply("\n".join(lines), disable_web_page_preview=True)
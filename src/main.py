@@ -1,14 +1,21 @@
 import os
+import asyncio
 from datetime import datetime
 from dotenv import load_dotenv
 from pyrogram import Client, idle
 
 from extractors.youtubeExtractor import youtubeExtractor
 from extractors.worksheetExtractor import worksheetExtractor
+from extractors.sheetMirror import sheetMirror
 from managers.authManager import authManager
 from managers.apiKeysManager import apiManager
 from managers.stateStore import stateStore
 from managers.n8nManager import n8nManager
+from managers.blockingExecutor import shared_executor
+from managers.statHistory import statHistory
+from managers.quotaLedger import quotaLedger
+from managers.sheetsGateway import sheetsGateway
+from managers.healthProber import healthProber
 
 from handlers.startHandler import startHandler
 from handlers.startPipelineHandler import startPipelineHandler
@@ -19,6 +26,8 @@ from handlers.autostopHandler import autostopHandler
 from handlers.apiCheckHandler import apiCheckHandler
 from handlers.setDescriptionHandler import setDescriptionHandler
 from handlers.apiAddHandler import apiAddHandler
+from handlers.topHandler import topHandler
+from handlers.statHistoryHandler import statHistoryHandler
 
 load_dotenv()
 
@@ -30,6 +39,9 @@ class MyBot:
         self.api_hash = os.getenv("API_HASH")
         self.youtube_key = os.getenv("YOUTUBE_API_KEY")
         self.youtube_channel_id = os.getenv("YOUTUBE_CHANNEL_ID")
+        self.youtube_channel_ids = [
+            c.strip() for c in (os.getenv("YOUTUBE_CHANNEL_IDS") or self.youtube_channel_id or "").split(",") if c.strip()
+        ]
         self.spreadsheet_url = os.getenv("TABLE_LINK")
         self.file_location = os.getenv("FILE_LOCATION")
 
@@ -47,32 +59,91 @@ class MyBot:
             state_path=os.getenv("STATE_PATH", "state.json"),
             passphrase=os.getenv("AUTH_PASSPHRASE", ""),
         )
-        self.apis = apiManager(secrets_path=os.getenv("SECRETS_PATH", "secrets.json"))
+        self.quota = quotaLedger(
+            path=os.getenv("YOUTUBE_QUOTA_PATH", "youtube_quota.json"),
+            daily_budget=int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000")),
+            degrade_at=float(os.getenv("YOUTUBE_QUOTA_DEGRADE_AT", "0.8")),
+            refuse_at=float(os.getenv("YOUTUBE_QUOTA_REFUSE_AT", "0.95")),
+        )
+        # один шлюз на процесс: лимиты Sheets API общие для бота, зеркала и /api_check
+        self.sheets_gateway = sheetsGateway(
+            read_per_minute=float(os.getenv("SHEETS_READS_PER_MINUTE", "60")),
+            write_per_minute=float(os.getenv("SHEETS_WRITES_PER_MINUTE", "60")),
+            max_wait=float(os.getenv("SHEETS_MAX_WAIT", "30")),
+        )
+        self.apis = apiManager(
+            secrets_path=os.getenv("SECRETS_PATH", "secrets.json"),
+            quota=self.quota,
+            gateway=self.sheets_gateway,
+        )
         self.state = stateStore(path=os.getenv("RUNTIME_STATE_PATH", "runtime_state.json"))
-        self.youtube = youtubeExtractor(api_key=self.youtube_key)
+        self.youtube = youtubeExtractor(
+            api_key=self.youtube_key,
+            recent_strategy=os.getenv("YOUTUBE_RECENT_STRATEGY", "playlist"),
+            stats_ttl=float(os.getenv("YOUTUBE_STATS_TTL", "300")),
+            stats_max_stale=float(os.getenv("YOUTUBE_STATS_MAX_STALE", "3600")),
+            channel_ids=self.youtube_channel_ids,
+            quota=self.quota,
+        )
         self.worksheet = worksheetExtractor(
             file_location=self.file_location,
             spreadsheet_url=self.spreadsheet_url,
             worksheet_index=2,
+            metadata_ttl=float(os.getenv("SHEETS_METADATA_TTL", "600")),
+            spool_path=os.getenv("SHEETS_SPOOL_PATH", "sheets_spool.jsonl"),
+            flush_batch=int(os.getenv("SHEETS_FLUSH_BATCH", "50")),
+            flush_interval=float(os.getenv("SHEETS_FLUSH_INTERVAL", "30")),
+            mirror=sheetMirror(
+                path=os.getenv("SHEETS_MIRROR_PATH", "sheets_mirror.sqlite3"),
+                max_lag=float(os.getenv("SHEETS_MIRROR_MAX_LAG", "30")),
+                reconcile_interval=float(os.getenv("SHEETS_MIRROR_RECONCILE", "3600")),
+                gateway=self.sheets_gateway,
+            ) if os.getenv("SHEETS_MIRROR", "1") == "1" else None,
+            gateway=self.sheets_gateway,
         )
         self.n8n = n8nManager()
+        self.prober = healthProber(
+            self.apis,
+            fallback_channel_id=self.youtube_channel_id,
+            default_interval=float(os.getenv("HEALTH_INTERVAL", "300")),
+            intervals={
+                name: float(os.getenv(f"HEALTH_INTERVAL_{name.upper()}"))
+                for name, _ in apiManager.PROBES
+                if os.getenv(f"HEALTH_INTERVAL_{name.upper()}")
+            },
+            history_size=int(os.getenv("HEALTH_HISTORY", "20")),
+        )
+        self.history = statHistory(
+            path=os.getenv("STAT_HISTORY_PATH", "stat_history.sqlite3"),
+            min_interval=float(os.getenv("STAT_HISTORY_MIN_INTERVAL", "60")),
+        )
 
         handlers = [
             startHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id),
             startPipelineHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id),
-            statHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id),
+            statHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id, history=self.history),
             enqueueHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id),
             autorunHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id),
             autostopHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id),
-            apiCheckHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id),
+            apiCheckHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id, prober=self.prober),
             setDescriptionHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id),
             apiAddHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id),
+            topHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id),
+            statHistoryHandler(self.app, self.auth, self.apis, self.state, self.youtube, self.worksheet, self.n8n, self.youtube_channel_id, history=self.history),
         ]
         for h in handlers:
             h.register()
 
     async def _bootstrap(self):
-        pass
+        self.n8n.start_outbox()
+        await self.n8n.events.start(notify=self.app.send_message, allow_chat=self.auth.is_authorized)
+        self.flush_task = asyncio.create_task(self.worksheet.run_description_flusher())
+        # прогрев клиентов Google в фоне: старт бота ограничен только логином в Telegram
+        self.warmup_tasks = [
+            asyncio.create_task(self.youtube.warm_up_async()),
+            asyncio.create_task(self.worksheet.warm_up_async()),
+        ]
+        await self.prober.start()
 
     def run(self):
         now = datetime.now()
@@ -82,9 +153,21 @@ class MyBot:
             await self.app.start()
             await self._bootstrap()
             await idle()
+            self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+            await self.prober.stop()
+            try:
+                await self.worksheet.flush_descriptions_async()
+            except Exception as e:
+                print(f"[{datetime.now()}] Failed to flush descriptions: {e}")
+            await self.n8n.close()
             await self.app.stop()
 
         self.app.run(runner())
+        shared_executor.shutdown()
         print(f"[{now}] Exiting application ...")
 
 
@@ -1,14 +1,23 @@
 import json
 import os
+import time
+import asyncio
+import functools
 from pathlib import Path
 import requests
 from googleapiclient.discovery import build
 from gspread import service_account
 
+from managers.blockingExecutor import run_blocking
+from managers.sheetsGateway import sheetsGateway
+
 
 class apiManager:
-    def __init__(self, secrets_path: str = "secrets.json"):
+    def __init__(self, secrets_path: str = "secrets.json", quota=None, gateway: sheetsGateway | None = None):
         self.secrets_path = Path(secrets_path)
+        self.quota = quota
+        self.gateway = gateway or sheetsGateway()
+        self.health_deadline = float(os.getenv("HEALTH_DEADLINE", "12"))
         self.data = {}
         self._load()
 
@@ -46,33 +55,49 @@ class apiManager:
             errors.append(str(e))
         return {"updated": updated, "ignored": ignored, "errors": errors}
 
-    def health_all(self, fallback_channel_id: str = "") -> dict:
-        n8n = self.health_n8n()
-        yt = self.health_youtube(fallback_channel_id=fallback_channel_id)
-        sh = self.health_sheets()
-        cloud = self.health_cloudinary()
-        swift = self.health_swiftia()
-        gem = self.health_gemini()
-        all_ok = all(s.get("ok", False) for s in [n8n, yt, sh, cloud, swift, gem])
-        return {
-            "n8n": n8n,
-            "youtube": yt,
-            "sheets": sh,
-            "cloudinary": cloud,
-            "swiftia": swift,
-            "gemini": gem,
-            "all_ok": all_ok,
-        }
-
-    def health_human(self, fallback_channel_id: str = "") -> str:
-        res = self.health_all(fallback_channel_id=fallback_channel_id)
-        lines = []
-        lines.append(f"N8N_TEST_URL: {'OK' if res['n8n']['ok'] else 'FAIL'} ({res['n8n'].get('detail','')})")
-        lines.append(f"YouTube: {'OK' if res['youtube']['ok'] else 'FAIL'} ({res['youtube'].get('detail','')})")
-        lines.append(f"Sheets: {'OK' if res['sheets']['ok'] else 'FAIL'} ({res['sheets'].get('detail','')})")
-        lines.append(f"Cloudinary: {'OK' if res['cloudinary']['ok'] else 'FAIL'} ({res['cloudinary'].get('detail','')})")
-        lines.append(f"Swiftia: {'OK' if res['swiftia']['ok'] else 'FAIL'} ({res['swiftia'].get('detail','')})")
-        lines.append(f"Gemini: {'OK' if res['gemini']['ok'] else 'FAIL'} ({res['gemini'].get('detail','')})")
+    # (ключ проверки, подпись в /api_check)
+    PROBES = (
+        ("n8n", "N8N_TEST_URL"),
+        ("youtube", "YouTube"),
+        ("sheets", "Sheets"),
+        ("cloudinary", "Cloudinary"),
+        ("swiftia", "Swiftia"),
+        ("gemini", "Gemini"),
+    )
+
+    async def probe(self, name: str, fallback_channel_id: str = "", timeout: float | None = None) -> dict:
+        """Одна проверка в пуле 'health' с таймаутом; в результат добавляется latency_ms."""
+        timeout = self.health_deadline if timeout is None else timeout
+        fn = getattr(self, f"health_{name}")
+        if name == "youtube":
+            fn = functools.partial(fn, fallback_channel_id=fallback_channel_id)
+        started = time.monotonic()
+        try:
+            res = await asyncio.wait_for(run_blocking("health", fn), timeout=timeout)
+        except asyncio.TimeoutError:
+            res = {"ok": False, "detail": "timeout"}
+        except Exception as e:
+            res = {"ok": False, "detail": f"{e}"}
+        res["latency_ms"] = int((time.monotonic() - started) * 1000)
+        return res
+
+    async def health_all(self, fallback_channel_id: str = "", deadline: float | None = None) -> dict:
+        """Все проверки параллельно под общим дедлайном; не успевшие помечаются как timeout."""
+        names = [name for name, _ in self.PROBES]
+        results = await asyncio.gather(
+            *(self.probe(name, fallback_channel_id=fallback_channel_id, timeout=deadline) for name in names)
+        )
+        out = dict(zip(names, results))
+        out["all_ok"] = all(r.get("ok", False) for r in results)
+        return out
+
+    @staticmethod
+    def format_probe(label: str, res: dict) -> str:
+        return f"{label}: {'OK' if res['ok'] else 'FAIL'} ({res.get('detail','')}) — {res.get('latency_ms', 0)} мс"
+
+    async def health_human(self, fallback_channel_id: str = "") -> str:
+        res = await self.health_all(fallback_channel_id=fallback_channel_id)
+        lines = [self.format_probe(label, res[name]) for name, label in self.PROBES]
         lines.append(f"Overall: {'OK' if res['all_ok'] else 'FAIL'}")
         return "\n".join(lines)
 
@@ -103,6 +128,8 @@ class apiManager:
             return {"ok": False, "detail": "no channel_id"}
         try:
             yt = build("youtube", "v3", developerKey=api_key, cache_discovery=False)
+            if self.quota is not None:
+                self.quota.spend("channels.list")
             resp = yt.channels().list(id=channel_id, part="id").execute()
             items = resp.get("items", [])
             return {"ok": bool(items), "detail": "reachable" if items else "channel not found"}
@@ -119,10 +146,9 @@ class apiManager:
             return {"ok": False, "detail": "no spreadsheet_url"}
         try:
             gc = service_account(filename=sa_file)
-            book = gc.open_by_url(url)
-            ws = book.sheet1
-            _ = ws.get_all_values()
-            return {"ok": True, "detail": "reachable"}
+            # открытие таблицы уже читает её метаданные — этого достаточно, без выгрузки листа
+            book = self.gateway.read(gc.open_by_url, url)
+            return {"ok": True, "detail": f"reachable ({book.title})"}
         except Exception as e:
             return {"ok": False, "detail": f"{e}"}
 
@@ -0,0 +1,50 @@
+from __future__ import annotations
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class blockingExecutor:
+    """Ограниченные пулы потоков по бэкендам для синхронных клиентов (googleapiclient, gspread, requests).
+
+    Размер пула бэкенда: EXECUTOR_<BACKEND>_WORKERS, иначе значение из limits, иначе default_workers.
+    """
+
+    DEFAULT_LIMITS = {"youtube": 4, "sheets": 2, "health": 6, "disk": 1}
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_workers: int = 4) -> None:
+        self.limits = dict(self.DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.default_workers = default_workers
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+
+    def _workers(self, backend: str) -> int:
+        env = os.getenv(f"EXECUTOR_{backend.upper()}_WORKERS")
+        if env:
+            return max(1, int(env))
+        return max(1, int(self.limits.get(backend, self.default_workers)))
+
+    def pool(self, backend: str) -> ThreadPoolExecutor:
+        pool = self._pools.get(backend)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=self._workers(backend), thread_name_prefix=f"{backend}-io")
+            self._pools[backend] = pool
+        return pool
+
+    async def run(self, backend: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool(backend), functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools.clear()
+
+
+shared_executor = blockingExecutor()
+
+
+async def run_blocking(backend: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    return await shared_executor.run(backend, fn, *args, **kwargs)
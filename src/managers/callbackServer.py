@@ -0,0 +1,164 @@
+from __future__ import annotations
+import asyncio
+import hmac
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from aiohttp import web
+
+
+class callbackServer:
+    """Встроенный HTTP-эндпоинт, куда воркфлоу n8n POST-ят события по задачам.
+
+    POST /n8n/events {"job_id": "...", "chat_id": 123, "event": "started|clip_cut|published|failed", ...}
+
+    Без секрета сервер не поднимается; уведомления уходят только в чаты, прошедшие allow_chat.
+    """
+
+    EVENTS = ("started", "clip_cut", "published", "failed")
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: Optional[int] = None,
+        secret: Optional[str] = None,
+        *,
+        max_jobs: int = 500,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.secret = secret or ""
+        if self.port and not self.secret:
+            raise ValueError("N8N_CALLBACK_PORT задан без N8N_CALLBACK_SECRET: callback-сервер без авторизации не запускается")
+        self.max_jobs = max_jobs
+        self.counters: Dict[str, int] = {e: 0 for e in self.EVENTS}
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.last_event_at: Optional[float] = None
+        self._notify: Optional[Callable[[int, str], Awaitable[Any]]] = None
+        self._allow_chat: Callable[[int], bool] = lambda chat_id: False
+        self._runner: Optional[web.AppRunner] = None
+        # ссылки на задачи уведомлений, иначе их может собрать GC до завершения
+        self._notify_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.port)
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/n8n/events", self._handle_event)
+        app.router.add_get("/health", self._handle_health)
+        return app
+
+    async def start(
+        self,
+        notify: Optional[Callable[[int, str], Awaitable[Any]]] = None,
+        allow_chat: Optional[Callable[[int], bool]] = None,
+    ) -> None:
+        self._notify = notify
+        if allow_chat is not None:
+            self._allow_chat = allow_chat
+        if not self.enabled or self._runner is not None:
+            return
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, int(self.port)).start()
+
+    async def stop(self) -> None:
+        if self._notify_tasks:
+            await asyncio.gather(*self._notify_tasks, return_exceptions=True)
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _authorized(self, request: web.Request) -> bool:
+        if not self.secret:
+            return False
+        got = request.headers.get("X-Callback-Secret") or request.headers.get("Authorization") or ""
+        return hmac.compare_digest(got, self.secret)
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"ok": True, "jobs": len(self.jobs)})
+
+    async def _handle_event(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            return web.json_response({"ok": False, "error": "unauthorized"}, status=401)
+        try:
+            data = await request.json()
+        except Exception:
+            return web.json_response({"ok": False, "error": "invalid json"}, status=400)
+        if not isinstance(data, dict):
+            return web.json_response({"ok": False, "error": "payload is not object"}, status=400)
+        event = str(data.get("event", "")).strip().lower()
+        if event not in self.EVENTS:
+            return web.json_response({"ok": False, "error": f"unknown event '{event}'"}, status=400)
+        if data.get("chat_id") is not None:
+            try:
+                data["chat_id"] = int(data["chat_id"])
+            except (TypeError, ValueError):
+                return web.json_response({"ok": False, "error": "chat_id must be integer"}, status=400)
+
+        job = self._apply(event, data)
+        text = self._render(event, job, data)
+        chat_id = job.get("chat_id")
+        if text and chat_id and self._notify is not None:
+            if self._allow_chat(chat_id):
+                task = asyncio.create_task(self._safe_notify(chat_id, text))
+                self._notify_tasks.add(task)
+                task.add_done_callback(self._notify_tasks.discard)
+            else:
+                print(f"[n8n callbacks] чат {chat_id} не авторизован, уведомление не отправлено")
+        return web.json_response({"ok": True})
+
+    def _apply(self, event: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.time()
+        job_id = str(data.get("job_id") or data.get("video_url") or "unknown")
+        job = self.jobs.get(job_id)
+        if job is None:
+            if len(self.jobs) >= self.max_jobs:
+                oldest = min(self.jobs, key=lambda k: self.jobs[k]["updated_at"])
+                self.jobs.pop(oldest, None)
+            job = {"job_id": job_id, "chat_id": None, "status": "started", "clips": 0, "published": 0,
+                   "started_at": now, "updated_at": now, "error": None}
+            self.jobs[job_id] = job
+        if data.get("chat_id") is not None:
+            job["chat_id"] = data.get("chat_id")
+        if data.get("video_url"):
+            job["video_url"] = data.get("video_url")
+        if event == "clip_cut":
+            job["clips"] += 1
+        elif event == "published":
+            job["published"] += 1
+        elif event == "failed":
+            job["error"] = str(data.get("error") or "")[:300]
+        job["status"] = event
+        job["updated_at"] = now
+        self.counters[event] += 1
+        self.last_event_at = now
+        return job
+
+    @staticmethod
+    def _render(event: str, job: Dict[str, Any], data: Dict[str, Any]) -> Optional[str]:
+        name = job.get("video_url") or job["job_id"]
+        if event == "started":
+            return f"▶️ n8n: задача запущена — {name}"
+        if event == "published":
+            return f"✅ n8n: опубликовано — {name} (клипов нарезано: {job['clips']})"
+        if event == "failed":
+            return f"❌ n8n: ошибка в задаче {name}: {job.get('error') or 'без описания'}"
+        # clip_cut только обновляет счётчики, чтобы не спамить чат
+        return None
+
+    async def _safe_notify(self, chat_id: int, text: str) -> None:
+        try:
+            await self._notify(chat_id, text)
+        except Exception as e:
+            print(f"[n8n callbacks] не удалось отправить сообщение в {chat_id}: {e}")
+
+    def summary(self) -> Dict[str, Any]:
+        active = sum(1 for j in self.jobs.values() if j["status"] in ("started", "clip_cut"))
+        return {
+            "counters": dict(self.counters),
+            "active_jobs": active,
+            "last_event_at": self.last_event_at,
+        }
@@ -0,0 +1,99 @@
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+
+class circuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_concurrency: int = 10,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.slots = asyncio.Semaphore(self.max_concurrency)
+        self._state = self.CLOSED
+        self._opened_at: Optional[float] = None
+        self._probe_inflight = False
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._opened_at is not None:
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_inflight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Можно ли сейчас слать запрос. В half-open пропускается ровно один пробный вызов."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_inflight:
+            self._probe_inflight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def release_probe(self) -> None:
+        """Вызов прерван без результата (например, отменён): пробный слот снова свободен."""
+        self._probe_inflight = False
+
+    def record_success(self) -> None:
+        self.successes += 1
+        self.consecutive_failures = 0
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._probe_inflight = False
+
+    def record_failure(self, error: str = "") -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error[:200] if error else None
+        if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_inflight = False
+
+    def retry_in(self) -> float:
+        if self.state != self.OPEN or self._opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "in_flight": self.max_concurrency - self.slots._value,
+            "retry_in": round(self.retry_in(), 1),
+            "last_error": self.last_error,
+        }
+
+    def human(self) -> str:
+        s = self.snapshot()
+        line = (
+            f"{self.name}: {s['state'].upper()} "
+            f"(ok {s['successes']}, fail {s['failures']}, rejected {s['rejected']}, "
+            f"in-flight {s['in_flight']}/{self.max_concurrency})"
+        )
+        if s["state"] == self.OPEN:
+            line += f", повтор через {s['retry_in']} с"
+        return line
@@ -0,0 +1,101 @@
+from __future__ import annotations
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+class healthProber:
+    """Фоновые проверки интеграций apiManager, каждая со своим интервалом.
+
+    Держит в памяти последний результат, короткую историю OK/FAIL и uptime,
+    чтобы /api_check отвечал из кэша, не дожидаясь внешних сервисов.
+    """
+
+    def __init__(
+        self,
+        apis,
+        fallback_channel_id: str = "",
+        *,
+        default_interval: float = 300.0,
+        intervals: Optional[Dict[str, float]] = None,
+        history_size: int = 20,
+        flap_threshold: int = 3,
+    ) -> None:
+        self.apis = apis
+        self.fallback_channel_id = fallback_channel_id or ""
+        self.labels = dict(apis.PROBES)
+        self.intervals = {name: float((intervals or {}).get(name, default_interval)) for name in self.labels}
+        self.flap_threshold = int(flap_threshold)
+        self.latest: Dict[str, Dict[str, Any]] = {}
+        self.history: Dict[str, Deque[bool]] = {name: deque(maxlen=history_size) for name in self.labels}
+        self._locks = {name: asyncio.Lock() for name in self.labels}
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._loop(name)) for name in self.labels]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, name: str) -> None:
+        # небольшой разброс старта, чтобы проверки не били по сетям одновременно
+        await asyncio.sleep(random.uniform(0, 5))
+        while True:
+            try:
+                await self.refresh_one(name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[healthProber] {name}: {e}")
+            await asyncio.sleep(self.intervals[name])
+
+    async def refresh_one(self, name: str) -> Dict[str, Any]:
+        async with self._locks[name]:
+            res = await self.apis.probe(name, fallback_channel_id=self.fallback_channel_id)
+            res["checked_at"] = time.time()
+            self.latest[name] = res
+            self.history[name].append(bool(res.get("ok")))
+            return res
+
+    async def refresh(self) -> None:
+        """Принудительно перепроверить все интеграции параллельно."""
+        await asyncio.gather(*(self.refresh_one(name) for name in self.labels))
+
+    @property
+    def ready(self) -> bool:
+        return len(self.latest) == len(self.labels)
+
+    def uptime(self, name: str) -> Optional[float]:
+        hist = self.history[name]
+        return sum(hist) / len(hist) * 100 if hist else None
+
+    def flips(self, name: str) -> int:
+        hist = list(self.history[name])
+        return sum(1 for a, b in zip(hist, hist[1:]) if a != b)
+
+    def human(self) -> str:
+        now = time.time()
+        lines = []
+        for name, label in self.labels.items():
+            res = self.latest.get(name)
+            if res is None:
+                lines.append(f"{label}: ещё не проверялось")
+                continue
+            hist = self.history[name]
+            line = self.apis.format_probe(label, res)
+            line += f", {int(now - res['checked_at'])} с назад · uptime {self.uptime(name):.0f}% ({len(hist)})"
+            line += " " + "".join("▮" if ok else "▯" for ok in hist)
+            flips = self.flips(name)
+            if flips >= self.flap_threshold:
+                line += f" ⚠ нестабильно, смен статуса: {flips}"
+            lines.append(line)
+        all_ok = self.ready and all(r.get("ok") for r in self.latest.values())
+        lines.append(f"Overall: {'OK' if all_ok else 'FAIL'}")
+        return "\n".join(lines)
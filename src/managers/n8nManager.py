@@ -1,8 +1,14 @@
 import os
-import json
-import requests
+import asyncio
+import aiohttp
 from dotenv import load_dotenv
 
+from managers.webhookOutbox import webhookOutbox
+from managers.videoIndex import videoIndex
+from managers.singleFlight import singleFlight
+from managers.callbackServer import callbackServer
+from managers.circuitBreaker import circuitBreaker
+
 load_dotenv()
 
 class n8nManager:
@@ -12,38 +18,231 @@ class n8nManager:
         self.webhook_autorun = os.getenv("N8N_AUTORUN_URL")
         self.auth = os.getenv("N8N_AUTH")
 
+        self.connect_timeout = float(os.getenv("N8N_CONNECT_TIMEOUT", "5"))
+        self.read_timeout = float(os.getenv("N8N_READ_TIMEOUT", "20"))
+        self.pool_limit = int(os.getenv("N8N_POOL_LIMIT", "100"))
+        self.pool_limit_per_host = int(os.getenv("N8N_POOL_LIMIT_PER_HOST", "20"))
+        self._session: aiohttp.ClientSession | None = None
+
+        self.breakers = {
+            kind: circuitBreaker(
+                kind,
+                failure_threshold=int(os.getenv("N8N_BREAKER_FAILURES", "5")),
+                reset_timeout=float(os.getenv("N8N_BREAKER_RESET", "30")),
+                max_concurrency=int(os.getenv("N8N_MAX_CONCURRENCY", "10")),
+            )
+            for kind in ("start", "enqueue", "autorun")
+        }
+
+        self.outbox = webhookOutbox(
+            path=os.getenv("N8N_OUTBOX_PATH", "n8n_outbox.sqlite3"),
+            base_delay=float(os.getenv("N8N_RETRY_BASE_DELAY", "5")),
+            max_delay=float(os.getenv("N8N_RETRY_MAX_DELAY", "900")),
+            max_attempts=int(os.getenv("N8N_RETRY_MAX_ATTEMPTS", "20")),
+        )
+        self.outbox_poll = float(os.getenv("N8N_OUTBOX_POLL", "5"))
+        self.enqueue_batch_size = max(1, int(os.getenv("N8N_ENQUEUE_BATCH_SIZE", "25")))
+        self.start_flight = singleFlight(window=float(os.getenv("N8N_START_COALESCE_WINDOW", "60")))
+        self.events = callbackServer(
+            host=os.getenv("N8N_CALLBACK_HOST", "127.0.0.1"),
+            port=int(os.getenv("N8N_CALLBACK_PORT", "0")) or None,
+            secret=os.getenv("N8N_CALLBACK_SECRET"),
+        )
+        self.videos = videoIndex(
+            path=os.getenv("VIDEO_INDEX_PATH", "video_index.sqlite3"),
+            use_bloom=os.getenv("VIDEO_INDEX_BLOOM", "0") == "1",
+        )
+        self._drain_task: asyncio.Task | None = None
+
     def _headers(self) -> dict:
         headers = {"Content-Type": "application/json"}
         if self.auth:
             headers["Authorization"] = self.auth
         return headers
 
-    def _post(self, url: str, payload: dict) -> str:
+    def _get_session(self) -> aiohttp.ClientSession:
+        # одна сессия = один keep-alive пул на весь бот; создаётся внутри работающего loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=None,
+                sock_connect=self.connect_timeout,
+                sock_read=self.read_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    def _url_for(self, kind: str) -> str | None:
+        return {
+            "start": self.webhook_start,
+            "enqueue": self.webhook_enqueue,
+            "autorun": self.webhook_autorun,
+        }.get(kind)
+
+    async def close(self) -> None:
+        await self.events.stop()
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            try:
+                await self._drain_task
+            except asyncio.CancelledError:
+                pass
+            self._drain_task = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _send(self, url: str, payload: dict) -> tuple[bool, bool, str]:
+        """(ok, retryable, note): retryable — таймауты, сетевые ошибки, 429 и 5xx."""
         if not url:
-            return "Webhook URL не настроен."
+            return False, False, "Webhook URL не настроен."
         try:
-            r = requests.post(url, headers=self._headers(), data=json.dumps(payload), timeout=20)
-            if 200 <= r.status_code < 300:
-                return "Успешно отправлено в n8n."
-            return f"n8n ответил HTTP {r.status_code}: {r.text[:200]}"
-        except requests.Timeout:
-            return "⏱n8n: таймаут запроса."
+            async with self._get_session().post(url, headers=self._headers(), json=payload) as r:
+                if 200 <= r.status < 300:
+                    return True, False, "Успешно отправлено в n8n."
+                text = await r.text()
+                retryable = r.status == 429 or r.status >= 500
+                return False, retryable, f"n8n ответил HTTP {r.status}: {text[:200]}"
+        except asyncio.TimeoutError:
+            return False, True, "⏱n8n: таймаут запроса."
+        except aiohttp.ClientError as e:
+            return False, True, f"Ошибка n8n: {e}"
         except Exception as e:
-            return f"Ошибка n8n: {e}"
+            return False, False, f"Ошибка n8n: {e}"
+
+    async def _send_kind(self, kind: str, payload: dict) -> tuple[bool, bool, str]:
+        """_send через circuit breaker и семафор конкретного вебхука."""
+        url = self._url_for(kind)
+        if not url:
+            return False, False, "Webhook URL не настроен."
+        breaker = self.breakers[kind]
+        if not breaker.allow():
+            return False, True, f"n8n ({kind}) недоступен, повторная попытка через {breaker.retry_in():.0f} с."
+        try:
+            async with breaker.slots:
+                ok, retryable, note = await self._send(url, payload)
+        except BaseException:
+            # отмена посреди пробного вызова не должна навсегда оставить breaker в half-open
+            breaker.release_probe()
+            raise
+        if ok or not retryable:
+            breaker.record_success()
+        else:
+            breaker.record_failure(note)
+        return ok, retryable, note
+
+    async def _post(self, kind: str, payload: dict) -> str:
+        _, _, note = await self._send_kind(kind, payload)
+        return note
+
+    def breakers_human(self) -> str:
+        lines = ["n8n вебхуки:"]
+        lines += [f"• {b.human()}" for b in self.breakers.values()]
+        st = self.outbox.stats()
+        lines.append(f"• outbox: в ожидании {st.get('pending', 0)}, недоставлено {st.get('dead', 0)}")
+        return "\n".join(lines)
+
+    async def _deliver(self, kind: str, payload: dict) -> tuple[str, str]:
+        """Сначала пишем вызов в outbox, потом отправляем; при сбое — повтор в фоне.
+        Возвращает (status, note), status: sent | queued | failed."""
+        if not self._url_for(kind):
+            return "failed", "Webhook URL не настроен."
+        lease = self.connect_timeout + self.read_timeout + 5
+        entry_id = self.outbox.add(kind, payload, lease=lease)
+        ok, retryable, note = await self._send_kind(kind, payload)
+        if ok:
+            self.outbox.mark_delivered(entry_id)
+            return "sent", note
+        if retryable and self.outbox.reschedule(entry_id, note) is not None:
+            return "queued", f"{note}\nЗапрос сохранён и будет отправлен повторно автоматически."
+        self.outbox.mark_dead(entry_id, note)
+        return "failed", note
+
+    def start_outbox(self) -> None:
+        """Replay незавершённых вызовов и запуск фонового дренера (из MyBot._bootstrap)."""
+        # повторные запуски, накопленные старыми версиями, не должны уйти в n8n пачкой
+        self.outbox.collapse("start")
+        self.outbox.release_all()
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain_loop())
+
+    async def _drain_loop(self) -> None:
+        lease = self.connect_timeout + self.read_timeout + 5
+        while True:
+            try:
+                for entry in self.outbox.due(lease=lease):
+                    ok, retryable, note = await self._send_kind(entry["kind"], entry["payload"])
+                    if ok:
+                        self.outbox.mark_delivered(entry["id"])
+                    elif not retryable or self.outbox.reschedule(entry["id"], note) is None:
+                        self.outbox.mark_dead(entry["id"], note)
+                        self._forget_enqueued(entry)
+                        print(f"[n8n outbox] #{entry['id']} ({entry['kind']}) не доставлен: {note}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[n8n outbox] ошибка дренера: {e}")
+            await asyncio.sleep(self.outbox_poll)
+
+    def _forget_enqueued(self, entry: dict) -> None:
+        """Недоставленные ссылки убираем из индекса, чтобы их можно было поставить снова."""
+        if entry["kind"] != "enqueue":
+            return
+        payload = entry["payload"]
+        urls = payload.get("urls") or ([payload["url"]] if payload.get("url") else [])
+        self.videos.forget(urls)
 
     async def trigger_start(self, chat_id: int) -> str:
         """POST в webhook_start"""
         payload = {"trigger": "manual", "chat_id": chat_id}
-        return self._post(self.webhook_start, payload)
 
-    async def trigger_enqueue(self, chat_id: int, url: str) -> str:
+        async def deliver_once() -> tuple[str, str]:
+            # в outbox держим не больше одного запуска: иначе после восстановления n8n
+            # дренер отправит все накопленные запуски подряд
+            if self.outbox.pending_of("start") is not None:
+                return "queued", "Запуск пайплайна уже ожидает повторной отправки в n8n — новый не добавлен."
+            return await self._deliver("start", payload)
+
+        (_, note), merged = await self.start_flight.do(
+            "start",
+            deliver_once,
+            cache_if=lambda res: res[0] != "failed",
+        )
+        if merged:
+            return f"Запуск пайплайна уже выполняется — запрос объединён с ним.\n{note}"
+        return note
+
+    async def trigger_enqueue(self, chat_id: int, url: str, *, reserved: bool = False) -> str:
         """POST в webhook_enqueue"""
         payload = {"url": url, "chat_id": chat_id}
-        return self._post(self.webhook_enqueue, payload)
+        status, note = await self._deliver("enqueue", payload)
+        self._settle_videos([url], chat_id, status, reserved)
+        return note
+
+    async def trigger_enqueue_batch(self, chat_id: int, urls: list[str], *, reserved: bool = False) -> tuple[str, str]:
+        """POST в webhook_enqueue пачкой: {"urls": [...], "chat_id": ...}"""
+        payload = {"urls": list(urls), "chat_id": chat_id}
+        status, note = await self._deliver("enqueue", payload)
+        self._settle_videos(urls, chat_id, status, reserved)
+        return status, note
+
+    def _settle_videos(self, urls: list[str], chat_id: int, status: str, reserved: bool) -> None:
+        """reserved — ключи заняты заранее через videos.reserve и при неудаче освобождаются;
+        иначе (например, /enqueue_force) запоминаем только принятые ссылки."""
+        if status == "failed":
+            if reserved:
+                self.videos.forget(urls)
+        elif not reserved:
+            self.videos.remember(urls, chat_id)
 
     async def trigger_autorun(self, chat_id: int, action: str, minutes: int | None = None) -> str:
         """POST в webhook_autorun"""
         payload = {"chat_id": chat_id, "action": action}
         if action == "start" and minutes:
             payload["minutes"] = minutes
-        return self._post(self.webhook_autorun, payload)
\ No newline at end of file
+        return await self._post("autorun", payload)
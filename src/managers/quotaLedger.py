@@ -0,0 +1,104 @@
+from __future__ import annotations
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+# Квота YouTube Data API сбрасывается в полночь по тихоокеанскому времени
+_QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+
+
+class quotaLedger:
+    COSTS = {
+        "channels.list": 1,
+        "playlistItems.list": 1,
+        "videos.list": 1,
+        "search.list": 100,
+    }
+
+    def __init__(
+        self,
+        path: str = "youtube_quota.json",
+        *,
+        daily_budget: int = 10000,
+        degrade_at: float = 0.8,
+        refuse_at: float = 0.95,
+        keep_days: int = 14,
+    ) -> None:
+        self.path = Path(path)
+        self.daily_budget = int(daily_budget)
+        self.degrade_at = float(degrade_at)
+        self.refuse_at = float(refuse_at)
+        self.keep_days = int(keep_days)
+        self._lock = threading.Lock()
+        self.data: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            self.data = json.loads(self.path.read_text(encoding="utf-8")).get("days", {})
+        except Exception as e:
+            # битый файл не перезаписываем молча: откладываем его рядом для разбора
+            broken = self.path.with_suffix(self.path.suffix + ".broken")
+            print(f"[quota] не удалось прочитать {self.path}: {e}; файл сохранён как {broken}, учёт начат заново")
+            self.path.replace(broken)
+            self.data = {}
+
+    def _save(self) -> None:
+        days = sorted(self.data)[-self.keep_days:]
+        self.data = {d: self.data[d] for d in days}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # запись через tmp + fsync + replace: падение посреди записи не обнуляет дневной расход
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write(json.dumps({"days": self.data}, ensure_ascii=False, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self.path)
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(_QUOTA_TZ).date().isoformat()
+
+    def cost(self, method: str) -> int:
+        return self.COSTS.get(method, 1)
+
+    def used(self) -> int:
+        return int(self.data.get(self._today(), {}).get("total", 0))
+
+    def level(self) -> str:
+        """ok | degraded (дешёвые эндпоинты и кэш) | exhausted (новые запросы запрещены)."""
+        ratio = self.used() / self.daily_budget if self.daily_budget else 0.0
+        if ratio >= self.refuse_at:
+            return "exhausted"
+        if ratio >= self.degrade_at:
+            return "degraded"
+        return "ok"
+
+    def spend(self, method: str, units: Optional[int] = None) -> None:
+        """Списать единицы до вызова; бросает RuntimeError, если вызов выведет за порог отказа."""
+        units = self.cost(method) if units is None else int(units)
+        with self._lock:
+            day = self._today()
+            entry = self.data.setdefault(day, {"total": 0, "by_method": {}})
+            if self.daily_budget and entry["total"] + units > self.daily_budget * self.refuse_at:
+                raise RuntimeError(
+                    f"квота YouTube API почти исчерпана ({entry['total']}/{self.daily_budget}), {method} отклонён"
+                )
+            entry["total"] += units
+            entry["by_method"][method] = entry["by_method"].get(method, 0) + units
+            self._save()
+
+    def human(self) -> str:
+        today = self.data.get(self._today(), {"total": 0, "by_method": {}})
+        pct = today["total"] / self.daily_budget * 100 if self.daily_budget else 0.0
+        line = f"YouTube квота: {today['total']}/{self.daily_budget} ед. ({pct:.1f}%, режим: {self.level()})"
+        if today["by_method"]:
+            parts = ", ".join(f"{m} {u}" for m, u in sorted(today["by_method"].items(), key=lambda x: -x[1]))
+            line += f"\n• {parts}"
+        return line
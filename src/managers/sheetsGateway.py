@@ -0,0 +1,106 @@
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+from managers.blockingExecutor import run_blocking
+from managers.singleFlight import singleFlight
+
+
+class tokenBucket:
+    def __init__(self, per_minute: float, burst: int | None = None) -> None:
+        self.rate = float(per_minute) / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(per_minute) // 6))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self) -> bool:
+        """Списать токен, не дожидаясь его: баланс может уйти в минус (долг).
+        True, если токен был в наличии."""
+        with self._lock:
+            self._refill()
+            had = self._tokens >= 1
+            self._tokens -= 1
+            return had
+
+    def delay(self) -> float:
+        """Сколько секунд ждать, пока появится целый токен (0 — можно сейчас)."""
+        with self._lock:
+            self._refill()
+            return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+
+class sheetsGateway:
+    """Единая точка доступа к Google Sheets.
+
+    Синхронный код в пулах потоков вызывает read/write: они только списывают токены поминутных
+    квот (чтения и записи раздельно) и никогда не спят, чтобы не держать потоки пула sheets.
+    Ожидание квоты и склейка одинаковых задач происходят на event loop в run — до run_blocking.
+    """
+
+    def __init__(self, read_per_minute: float = 60, write_per_minute: float = 60, max_wait: float = 30.0) -> None:
+        self.reads = tokenBucket(read_per_minute)
+        self.writes = tokenBucket(write_per_minute)
+        self.max_wait = float(max_wait)
+        self._flights = singleFlight()
+        self._admit_lock = asyncio.Lock()
+        self.counters = {"reads": 0, "writes": 0, "coalesced": 0, "throttled": 0}
+
+    def read(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        self.reads.take()
+        self.counters["reads"] += 1
+        return fn(*args, **kwargs)
+
+    def write(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        self.writes.take()
+        self.counters["writes"] += 1
+        return fn(*args, **kwargs)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, key: Optional[Hashable] = None, write: bool = False) -> Any:
+        """Выполнить fn в пуле sheets, когда квота это позволяет.
+
+        Задачи с одинаковым key, запущенные одновременно, выполняются один раз. RuntimeError,
+        если квота не освободится за max_wait секунд.
+        """
+        bucket = self.writes if write else self.reads
+
+        async def job() -> Any:
+            await self._admit(bucket)
+            return await run_blocking("sheets", fn, *args)
+
+        if key is None:
+            return await job()
+        result, merged = await self._flights.do(key, job)
+        if merged:
+            self.counters["coalesced"] += 1
+        return result
+
+    async def _admit(self, bucket: tokenBucket) -> None:
+        started = time.monotonic()
+        throttled = False
+        # задачи пропускаются по одной: после ожидания каждая заново проверяет баланс
+        async with self._admit_lock:
+            while True:
+                delay = bucket.delay()
+                if delay <= 0:
+                    return
+                if time.monotonic() - started + delay > self.max_wait:
+                    raise RuntimeError("лимит запросов к Google Sheets исчерпан, попробуйте позже")
+                if not throttled:
+                    throttled = True
+                    self.counters["throttled"] += 1
+                await asyncio.sleep(delay)
+
+    def human(self) -> str:
+        c = self.counters
+        return (
+            f"Sheets шлюз: чтений {c['reads']}, записей {c['writes']}, "
+            f"склеено {c['coalesced']}, ожиданий лимита {c['throttled']}"
+        )
@@ -0,0 +1,50 @@
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class singleFlight:
+    """Объединяет одновременные (и близкие по времени, в пределах window) вызовы с одним ключом."""
+
+    def __init__(self, window: float = 0.0) -> None:
+        self.window = float(window)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        *,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[Any, bool]:
+        """(результат, merged): merged=True, если вызов присоединился к чужому."""
+        recent = self._recent.get(key)
+        if recent is not None and time.monotonic() - recent[0] < self.window:
+            return recent[1], True
+
+        task = self._inflight.get(key)
+        merged = task is not None
+        if task is None:
+            # вызов живёт в собственной задаче: отмена того, кто его начал, не отменяет остальных
+            task = asyncio.ensure_future(self._run(key, factory, cache_if))
+            self._inflight[key] = task
+        return await asyncio.shield(task), merged
+
+    async def _run(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        cache_if: Optional[Callable[[Any], bool]],
+    ) -> Any:
+        try:
+            result = await factory()
+        finally:
+            self._inflight.pop(key, None)
+        if self.window > 0 and (cache_if is None or cache_if(result)):
+            self._recent[key] = (time.monotonic(), result)
+        return result
+
+    def forget(self, key: Hashable) -> None:
+        self._recent.pop(key, None)
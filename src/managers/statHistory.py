@@ -0,0 +1,84 @@
+from __future__ import annotations
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+METRICS = (
+    "views",
+    "subs",
+    "videos",
+    "videos_last_24h",
+    "videos_processed",
+    "clips_processed",
+    "videos_in_queue",
+    "clips_in_queue",
+)
+
+
+class statHistory:
+    """Локальный временной ряд снапшотов /stat: канал YouTube + счётчики агента из Sheets."""
+
+    def __init__(self, path: str = "stat_history.sqlite3", *, min_interval: float = 60.0) -> None:
+        self.path = Path(path)
+        self.min_interval = float(min_interval)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        cols = ", ".join(f"{m} INTEGER" for m in METRICS)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS snapshots (ts REAL NOT NULL, channel_id TEXT NOT NULL, {cols})"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS snapshots_ts ON snapshots(channel_id, ts)")
+
+    def record(self, channel_id: str, snapshot: Dict[str, Any], *, ts: Optional[float] = None) -> bool:
+        """Сохранить снапшот; чаще min_interval для одного канала не пишем. False — пропущено."""
+        ts = time.time() if ts is None else ts
+        last = self._conn.execute(
+            "SELECT MAX(ts) FROM snapshots WHERE channel_id = ?", (channel_id,)
+        ).fetchone()[0]
+        if last is not None and ts - last < self.min_interval:
+            return False
+        values = [snapshot.get(m) for m in METRICS]
+        if all(v is None for v in values):
+            return False
+        placeholders = ", ".join("?" for _ in range(len(METRICS) + 2))
+        self._conn.execute(
+            f"INSERT INTO snapshots(ts, channel_id, {', '.join(METRICS)}) VALUES ({placeholders})",
+            [ts, channel_id, *[None if v is None else int(v) for v in values]],
+        )
+        return True
+
+    def query(self, channel_id: str, since_ts: float) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            "SELECT * FROM snapshots WHERE channel_id = ? AND ts >= ? ORDER BY ts", (channel_id, since_ts)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def deltas(self, channel_id: str, hours: float) -> Optional[Dict[str, Any]]:
+        """Изменение каждой метрики между первым и последним снапшотом окна и скорость в час."""
+        rows = self.query(channel_id, time.time() - hours * 3600)
+        if len(rows) < 2:
+            return None
+        span_hours = (rows[-1]["ts"] - rows[0]["ts"]) / 3600
+        if span_hours <= 0:
+            return None
+        out: Dict[str, Any] = {"from_ts": rows[0]["ts"], "to_ts": rows[-1]["ts"], "points": len(rows), "metrics": {}}
+        for m in METRICS:
+            series = [r[m] for r in rows if r[m] is not None]
+            if len(series) < 2:
+                continue
+            first_ts = next(r["ts"] for r in rows if r[m] is not None)
+            last_ts = next(r["ts"] for r in reversed(rows) if r[m] is not None)
+            hrs = (last_ts - first_ts) / 3600
+            delta = series[-1] - series[0]
+            out["metrics"][m] = {
+                "last": series[-1],
+                "delta": delta,
+                "per_hour": delta / hrs if hrs > 0 else None,
+            }
+        return out
+
+    def close(self) -> None:
+        self._conn.close()
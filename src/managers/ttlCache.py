@@ -0,0 +1,35 @@
+from __future__ import annotations
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class ttlCache:
+    """Кэш с TTL и окном stale-while-revalidate.
+
+    get() отдаёт (value, age) пока age < ttl + max_stale; свежесть решает вызывающий код через is_fresh().
+    """
+
+    def __init__(self, ttl: float = 300.0, max_stale: float = 3600.0) -> None:
+        self.ttl = float(ttl)
+        self.max_stale = float(max_stale)
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        stored_at, value = item
+        age = time.monotonic() - stored_at
+        if age >= self.ttl + self.max_stale:
+            self._data.pop(key, None)
+            return None
+        return value, age
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic(), value)
+
+    def is_fresh(self, age: float) -> bool:
+        return age < self.ttl
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
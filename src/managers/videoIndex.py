@@ -0,0 +1,145 @@
+from __future__ import annotations
+import hashlib
+import math
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Dict, Any
+from urllib.parse import urlparse, parse_qs
+
+_YT_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YT_HOSTS = {"youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com"}
+_YT_PATH_PREFIXES = ("shorts", "embed", "live", "v", "e")
+
+
+def canonical_video_id(url: str) -> Optional[str]:
+    """ID YouTube-видео из любой формы ссылки (youtu.be, watch?v=, /shorts/, /embed/, /live/)."""
+    try:
+        p = urlparse((url or "").strip())
+    except Exception:
+        return None
+    host = (p.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    parts = [x for x in p.path.split("/") if x]
+    candidate = None
+    if host == "youtu.be":
+        candidate = parts[0] if parts else None
+    elif host in _YT_HOSTS:
+        if p.path.rstrip("/") == "/watch":
+            candidate = (parse_qs(p.query).get("v") or [None])[0]
+        elif len(parts) >= 2 and parts[0] in _YT_PATH_PREFIXES:
+            candidate = parts[1]
+    if candidate and _YT_ID_RE.match(candidate):
+        return candidate
+    return None
+
+
+def canonical_key(url: str) -> str:
+    """Ключ дедупликации: yt:<id> для YouTube, иначе нормализованный URL без фрагмента."""
+    vid = canonical_video_id(url)
+    if vid:
+        return f"yt:{vid}"
+    p = urlparse((url or "").strip())
+    host = (p.hostname or "").lower()
+    path = p.path.rstrip("/") or "/"
+    query = f"?{p.query}" if p.query else ""
+    return f"url:{host}{path}{query}"
+
+
+class bloomFilter:
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001) -> None:
+        n = max(1, int(capacity))
+        self.size = max(8, int(-n * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / n * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class videoIndex:
+    def __init__(self, path: str = "video_index.sqlite3", *, use_bloom: bool = False, bloom_capacity: int = 100_000) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                chat_id INTEGER,
+                first_seen REAL NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._bloom: Optional[bloomFilter] = None
+        if use_bloom:
+            count = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+            self._bloom = bloomFilter(capacity=max(bloom_capacity, count * 2))
+            for (key,) in self._conn.execute("SELECT key FROM seen"):
+                self._bloom.add(key)
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._bloom is not None and key not in self._bloom:
+            return None
+        row = self._conn.execute("SELECT url, chat_id, first_seen FROM seen WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return {"url": row[0], "chat_id": row[1], "first_seen": row[2]}
+
+    def partition(self, urls: Iterable[str]) -> Tuple[List[str], List[Tuple[str, Optional[float]]]]:
+        """(новые, дубликаты[(url, first_seen)]); повторы внутри самого списка тоже считаются дубликатами."""
+        fresh: List[str] = []
+        dups: List[Tuple[str, Optional[float]]] = []
+        batch_keys = set()
+        for url in urls:
+            key = canonical_key(url)
+            if key in batch_keys:
+                dups.append((url, None))
+                continue
+            hit = self.lookup(key)
+            if hit is not None:
+                dups.append((url, hit["first_seen"]))
+                continue
+            batch_keys.add(key)
+            fresh.append(url)
+        return fresh, dups
+
+    def reserve(self, urls: Iterable[str], chat_id: Optional[int] = None) -> Tuple[List[str], List[Tuple[str, Optional[float]]]]:
+        """partition + remember новых одним шагом, до отправки в n8n: параллельный /enqueue того же
+        видео уже увидит дубликат. Если отправка не удалась, ключи освобождаются через forget()."""
+        fresh, dups = self.partition(urls)
+        self.remember(fresh, chat_id)
+        return fresh, dups
+
+    def remember(self, urls: Iterable[str], chat_id: Optional[int] = None) -> None:
+        now = time.time()
+        rows = [(canonical_key(u), u, chat_id, now) for u in urls]
+        self._conn.executemany("INSERT OR IGNORE INTO seen(key, url, chat_id, first_seen) VALUES (?, ?, ?, ?)", rows)
+        if self._bloom is not None:
+            for key, *_ in rows:
+                self._bloom.add(key)
+
+    def forget(self, urls: Iterable[str]) -> int:
+        """Убрать ссылки из индекса (например, если отправка в n8n окончательно не удалась).
+        Bloom-фильтр удаление не поддерживает: ложное срабатывание снимется точной проверкой в SQLite."""
+        keys = [(canonical_key(u),) for u in urls]
+        cur = self._conn.executemany("DELETE FROM seen WHERE key = ?", keys)
+        return cur.rowcount
+
+    def close(self) -> None:
+        self._conn.close()
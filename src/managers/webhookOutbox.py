@@ -0,0 +1,133 @@
+from __future__ import annotations
+import json
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class webhookOutbox:
+    def __init__(
+        self,
+        path: str = "n8n_outbox.sqlite3",
+        *,
+        base_delay: float = 5.0,
+        max_delay: float = 900.0,
+        max_attempts: int = 20,
+    ) -> None:
+        self.path = Path(path)
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.max_attempts = int(max_attempts)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_error TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox(status, next_attempt_at)")
+
+    def add(self, kind: str, payload: Dict[str, Any], *, lease: float = 0.0) -> int:
+        """Записать вызов до отправки. lease — сколько секунд дренер не трогает запись."""
+        now = time.time()
+        cur = self._conn.execute(
+            "INSERT INTO outbox(kind, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+            (kind, json.dumps(payload, ensure_ascii=False), now + lease, now),
+        )
+        return int(cur.lastrowid)
+
+    def due(self, *, limit: int = 50, lease: float = 0.0) -> List[Dict[str, Any]]:
+        now = time.time()
+        rows = self._conn.execute(
+            "SELECT id, kind, payload, attempts FROM outbox "
+            "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+            (now, int(limit)),
+        ).fetchall()
+        if rows and lease:
+            self._conn.executemany(
+                "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                [(now + lease, r["id"]) for r in rows],
+            )
+        return [
+            {"id": r["id"], "kind": r["kind"], "payload": json.loads(r["payload"]), "attempts": r["attempts"]}
+            for r in rows
+        ]
+
+    def pending_of(self, kind: str) -> Optional[int]:
+        """id самой старой pending-записи этого вида (в том числе отправляемой прямо сейчас)."""
+        row = self._conn.execute(
+            "SELECT id FROM outbox WHERE kind = ? AND status = 'pending' ORDER BY id LIMIT 1", (kind,)
+        ).fetchone()
+        return None if row is None else int(row["id"])
+
+    def collapse(self, kind: str) -> int:
+        """Оставить только самую старую pending-запись вида kind; возвращает число удалённых."""
+        keep = self.pending_of(kind)
+        if keep is None:
+            return 0
+        cur = self._conn.execute(
+            "DELETE FROM outbox WHERE kind = ? AND status = 'pending' AND id != ?", (kind, keep)
+        )
+        return cur.rowcount
+
+    def release_all(self) -> int:
+        """Replay после рестарта: все pending-записи становятся доступны сразу."""
+        cur = self._conn.execute(
+            "UPDATE outbox SET next_attempt_at = ? WHERE status = 'pending'", (time.time(),)
+        )
+        return cur.rowcount
+
+    def mark_delivered(self, entry_id: int) -> None:
+        self._conn.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+    def mark_dead(self, entry_id: int, error: str) -> None:
+        self._conn.execute(
+            "UPDATE outbox SET status = 'dead', last_error = ? WHERE id = ?", (error[:500], entry_id)
+        )
+
+    def reschedule(self, entry_id: int, error: str) -> Optional[float]:
+        """Увеличить счётчик попыток и отложить запись. None — попытки исчерпаны, запись помечена dead."""
+        row = self._conn.execute("SELECT attempts FROM outbox WHERE id = ?", (entry_id,)).fetchone()
+        if row is None:
+            return None
+        attempts = int(row["attempts"]) + 1
+        if attempts >= self.max_attempts:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                (attempts, error[:500], entry_id),
+            )
+            return None
+        delay = self._backoff(attempts)
+        self._conn.execute(
+            "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+            (attempts, time.time() + delay, error[:500], entry_id),
+        )
+        return delay
+
+    def _backoff(self, attempts: int) -> float:
+        # экспонента с "equal jitter": половина задержки фиксирована, половина случайна
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status").fetchall()
+        out = {"pending": 0, "dead": 0}
+        for r in rows:
+            out[r["status"]] = int(r["n"])
+        return out
+
+    def close(self) -> None:
+        self._conn.close()
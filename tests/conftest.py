@@ -0,0 +1,119 @@
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# модули бота импортируются как в src/main.py: from managers.x import ...
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+class fakeClock:
+    """Подменяет модуль time в тестируемом модуле: monkeypatch.setattr(module, "time", fake_clock)."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock():
+    return fakeClock()
+
+
+_A1_RE = re.compile(r"^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+
+
+def _col_no(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - ord("A") + 1
+    return n
+
+
+class fakeWorksheet:
+    """Лист gspread в памяти: хватает методов, которыми пользуются экстракторы и зеркало."""
+
+    def __init__(self, rows, title="stat", ws_id=1):
+        self.rows = [list(r) for r in rows]
+        self.title = title
+        self.id = ws_id
+        self.calls = []
+
+    def _cell(self, r, c):
+        row = self.rows[r - 1] if 0 < r <= len(self.rows) else []
+        return row[c - 1] if 0 < c <= len(row) else ""
+
+    @staticmethod
+    def _trim(rows):
+        out = []
+        for row in rows:
+            row = list(row)
+            while row and row[-1] == "":
+                row.pop()
+            out.append(row)
+        while out and not out[-1]:
+            out.pop()
+        return out
+
+    def _range(self, a1):
+        c1, r1, c2, r2 = _A1_RE.match(a1).groups()
+        width = max((len(r) for r in self.rows), default=0)
+        if c2 is None and r2 is None:
+            c2, r2 = c1, r1
+        first_c = _col_no(c1) if c1 else 1
+        last_c = _col_no(c2) if c2 else width
+        first_r = int(r1) if r1 else 1
+        last_r = int(r2) if r2 else len(self.rows)
+        last_c = min(last_c, width)
+        return self._trim(
+            [[self._cell(r, c) for c in range(first_c, last_c + 1)] for r in range(first_r, last_r + 1)]
+        )
+
+    def get_all_values(self):
+        self.calls.append("get_all_values")
+        return [list(r) for r in self.rows]
+
+    def get(self, a1):
+        self.calls.append(f"get {a1}")
+        return self._range(a1)
+
+    def batch_get(self, ranges):
+        self.calls.append(f"batch_get {','.join(ranges)}")
+        return [self._range(a1) for a1 in ranges]
+
+    def col_values(self, col):
+        self.calls.append(f"col_values {col}")
+        values = [self._cell(r, col) for r in range(1, len(self.rows) + 1)]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def row_values(self, row):
+        self.calls.append(f"row_values {row}")
+        return self._trim([self.rows[row - 1]])[0] if 0 < row <= len(self.rows) and any(self.rows[row - 1]) else []
+
+    def batch_update(self, data, value_input_option=None):
+        self.calls.append("batch_update")
+        for item in data:
+            row = int(_A1_RE.match(item["range"]).group(2))
+            self.rows[row - 1] = list(item["values"][0])
+
+    def append_rows(self, values, value_input_option=None):
+        self.calls.append("append_rows")
+        first = len(self.rows) + 1
+        self.rows += [list(v) for v in values]
+        return {"updates": {"updatedRange": f"{self.title}!A{first}:D{len(self.rows)}"}}
+
+
+@pytest.fixture
+def fake_worksheet():
+    return fakeWorksheet
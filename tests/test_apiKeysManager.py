@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+pytest.importorskip("gspread")
+
+from managers.apiKeysManager import apiManager
+
+
+@pytest.fixture
+def apis(tmp_path, monkeypatch):
+    manager = apiManager(secrets_path=str(tmp_path / "secrets.json"))
+    for name, _ in manager.PROBES:
+        monkeypatch.setattr(manager, f"health_{name}", lambda **kwargs: {"ok": True, "detail": "reachable"})
+    return manager
+
+
+def test_health_all_marks_slow_probe_as_timeout(apis, monkeypatch):
+    release = threading.Event()
+
+    def hanging():
+        release.wait(5)
+        return {"ok": True, "detail": "late"}
+
+    monkeypatch.setattr(apis, "health_sheets", hanging)
+    started = time.monotonic()
+    try:
+        res = asyncio.run(apis.health_all(deadline=0.2))
+    finally:
+        release.set()
+
+    assert time.monotonic() - started < 2
+    assert res["sheets"]["ok"] is False
+    assert res["sheets"]["detail"] == "timeout"
+    assert 150 <= res["sheets"]["latency_ms"] < 2000
+    assert all(res[name]["ok"] for name, _ in apis.PROBES if name != "sheets")
+    assert res["all_ok"] is False
+
+
+def test_health_all_reports_probe_errors_and_passes_channel(apis, monkeypatch):
+    seen = {}
+
+    def youtube(fallback_channel_id=""):
+        seen["channel"] = fallback_channel_id
+        return {"ok": True, "detail": "reachable"}
+
+    def broken():
+        raise ValueError("bad config")
+
+    monkeypatch.setattr(apis, "health_youtube", youtube)
+    monkeypatch.setattr(apis, "health_gemini", broken)
+    res = asyncio.run(apis.health_all(fallback_channel_id="UC123", deadline=1))
+
+    assert seen["channel"] == "UC123"
+    assert res["gemini"] == {"ok": False, "detail": "bad config", "latency_ms": res["gemini"]["latency_ms"]}
+    assert res["all_ok"] is False
+
+
+def test_health_deadline_comes_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("HEALTH_DEADLINE", "3.5")
+    assert apiManager(secrets_path=str(tmp_path / "secrets.json")).health_deadline == 3.5
+
+
+def test_health_human_lists_every_probe(apis):
+    text = asyncio.run(apis.health_human())
+    lines = text.splitlines()
+    assert [line.split(":")[0] for line in lines[:-1]] == [label for _, label in apis.PROBES]
+    assert lines[-1] == "Overall: OK"
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer
+
+from managers.callbackServer import callbackServer
+
+SECRET = "s3cret"
+
+
+def run_with_client(server, scenario):
+    async def main():
+        async with TestClient(TestServer(server.make_app())) as client:
+            return await scenario(client)
+    return asyncio.run(main())
+
+
+async def post(client, payload, secret=SECRET):
+    headers = {"X-Callback-Secret": secret} if secret is not None else {}
+    resp = await client.post("/n8n/events", json=payload, headers=headers)
+    return resp.status
+
+
+def test_port_without_secret_is_refused():
+    with pytest.raises(ValueError):
+        callbackServer(port=8080, secret=None)
+
+
+def test_default_host_is_loopback():
+    assert callbackServer(secret=SECRET).host == "127.0.0.1"
+
+
+def test_job_lifecycle_counters_and_notify():
+    server = callbackServer(secret=SECRET)
+    sent = []
+
+    async def notify(chat_id, text):
+        sent.append((chat_id, text))
+
+    async def scenario(client):
+        await server.start(notify=notify, allow_chat=lambda chat_id: chat_id == 42)
+        url = "https://youtu.be/dQw4w9WgXcQ"
+        assert await post(client, {"job_id": "j1", "chat_id": 42, "event": "started", "video_url": url}) == 200
+        assert await post(client, {"job_id": "j1", "event": "clip_cut"}) == 200
+        assert await post(client, {"job_id": "j1", "event": "clip_cut"}) == 200
+        assert await post(client, {"job_id": "j1", "event": "published"}) == 200
+        assert await post(client, {"job_id": "j2", "chat_id": "42", "event": "failed", "error": "boom"}) == 200
+        await asyncio.sleep(0)
+
+    run_with_client(server, scenario)
+
+    assert server.counters == {"started": 1, "clip_cut": 2, "published": 1, "failed": 1}
+    assert server.jobs["j1"]["status"] == "published"
+    assert server.jobs["j1"]["clips"] == 2
+    assert server.jobs["j1"]["published"] == 1
+    assert server.jobs["j2"]["error"] == "boom"
+    assert server.summary()["active_jobs"] == 0
+    assert server._notify_tasks == set()
+    # clip_cut не шлёт сообщений: started, published, failed
+    assert [chat for chat, _ in sent] == [42, 42, 42]
+    assert "опубликовано" in sent[1][1] and "клипов нарезано: 2" in sent[1][1]
+    assert "boom" in sent[2][1]
+
+
+def test_unauthorized_chat_is_not_notified():
+    server = callbackServer(secret=SECRET)
+    sent = []
+
+    async def notify(chat_id, text):
+        sent.append(chat_id)
+
+    async def scenario(client):
+        await server.start(notify=notify, allow_chat=lambda chat_id: False)
+        status = await post(client, {"job_id": "j1", "chat_id": 777, "event": "started"})
+        await asyncio.sleep(0)
+        return status
+
+    assert run_with_client(server, scenario) == 200
+    assert server.counters["started"] == 1
+    assert sent == []
+
+
+def test_rejects_bad_requests():
+    server = callbackServer(secret=SECRET)
+
+    async def scenario(client):
+        return [
+            await post(client, {"job_id": "j1", "event": "started"}, secret=None),
+            await post(client, {"job_id": "j1", "event": "started"}, secret="wrong"),
+            await post(client, {"job_id": "j1", "event": "exploded"}),
+            await post(client, {"job_id": "j1", "chat_id": "abc", "event": "started"}),
+            await post(client, ["not", "an", "object"]),
+        ]
+
+    assert run_with_client(server, scenario) == [401, 401, 400, 400, 400]
+    assert server.jobs == {}
+    assert sum(server.counters.values()) == 0
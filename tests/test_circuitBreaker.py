@@ -0,0 +1,58 @@
+import pytest
+
+from managers import circuitBreaker as breaker_module
+from managers.circuitBreaker import circuitBreaker
+
+
+@pytest.fixture
+def breaker(monkeypatch, fake_clock):
+    monkeypatch.setattr(breaker_module, "time", fake_clock)
+    return circuitBreaker("start", failure_threshold=3, reset_timeout=30)
+
+
+def test_open_half_open_closed_cycle(breaker, fake_clock):
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure("HTTP 503")
+    assert breaker.state == circuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == 30
+
+    fake_clock.now += 30
+    assert breaker.state == circuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    # пока пробный вызов в полёте, остальные отклоняются
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == circuitBreaker.CLOSED
+    assert breaker.allow()
+    assert breaker.rejected == 2
+
+
+def test_failed_probe_reopens(breaker, fake_clock):
+    for _ in range(3):
+        breaker.record_failure("timeout")
+    fake_clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure("timeout")
+    assert breaker.state == circuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_released_probe_can_be_retried(breaker, fake_clock):
+    for _ in range(3):
+        breaker.record_failure("timeout")
+    fake_clock.now += 30
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.state == circuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_success_resets_consecutive_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == circuitBreaker.CLOSED
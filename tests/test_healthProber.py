@@ -0,0 +1,91 @@
+import asyncio
+
+from managers import healthProber as health_prober_module
+from managers.healthProber import healthProber
+
+
+class fakeApis:
+    PROBES = (("n8n", "N8N"), ("sheets", "Sheets"))
+
+    def __init__(self, script=None):
+        # name -> список ok по очереди; по исчерпании — последний
+        self.script = {name: list(oks) for name, oks in (script or {}).items()}
+        self.calls = []
+
+    async def probe(self, name, fallback_channel_id=""):
+        self.calls.append((name, fallback_channel_id))
+        oks = self.script.get(name, [True])
+        ok = oks.pop(0) if len(oks) > 1 else oks[0]
+        if ok is None:
+            raise RuntimeError("probe crashed")
+        return {"ok": ok, "detail": "reachable" if ok else "down", "latency_ms": 5}
+
+    @staticmethod
+    def format_probe(label, res):
+        return f"{label}: {'OK' if res['ok'] else 'FAIL'}"
+
+
+def test_refresh_fills_cache_and_passes_channel(monkeypatch, fake_clock):
+    monkeypatch.setattr(health_prober_module, "time", fake_clock)
+    apis = fakeApis()
+    prober = healthProber(apis, "UC123")
+    assert not prober.ready
+
+    asyncio.run(prober.refresh())
+
+    assert prober.ready
+    assert sorted(apis.calls) == [("n8n", "UC123"), ("sheets", "UC123")]
+    assert prober.latest["sheets"]["checked_at"] == fake_clock.now
+
+
+def test_uptime_and_flips_follow_history():
+    apis = fakeApis({"n8n": [True, False, True, True], "sheets": [True]})
+    prober = healthProber(apis, history_size=3)
+
+    async def main():
+        for _ in range(4):
+            await prober.refresh()
+
+    asyncio.run(main())
+    # в истории остаются последние три проверки: False, True, True
+    assert list(prober.history["n8n"]) == [False, True, True]
+    assert round(prober.uptime("n8n")) == 67
+    assert prober.flips("n8n") == 1
+    assert prober.uptime("sheets") == 100
+    assert prober.flips("sheets") == 0
+
+
+def test_human_marks_unchecked_and_flapping(monkeypatch, fake_clock):
+    monkeypatch.setattr(health_prober_module, "time", fake_clock)
+    apis = fakeApis({"n8n": [True, False, True, False]})
+    prober = healthProber(apis, flap_threshold=3)
+    assert prober.uptime("n8n") is None
+
+    async def main():
+        for _ in range(4):
+            await prober.refresh_one("n8n")
+
+    asyncio.run(main())
+    fake_clock.now += 42
+    lines = prober.human().splitlines()
+
+    assert lines[0].startswith("N8N: FAIL, 42 с назад · uptime 50% (4) ▮▯▮▯")
+    assert "нестабильно, смен статуса: 3" in lines[0]
+    assert lines[1] == "Sheets: ещё не проверялось"
+    assert lines[2] == "Overall: FAIL"
+
+
+def test_loop_survives_probe_errors_and_stops(monkeypatch):
+    monkeypatch.setattr(health_prober_module.random, "uniform", lambda a, b: 0)
+    apis = fakeApis({"n8n": [None, True], "sheets": [True]})
+    prober = healthProber(apis, default_interval=0.01)
+
+    async def main():
+        await prober.start()
+        await asyncio.sleep(0.1)
+        await prober.stop()
+
+    asyncio.run(main())
+    assert prober.latest["n8n"]["ok"] is True
+    assert len(prober.history["sheets"]) > 1
+    assert prober._tasks == []
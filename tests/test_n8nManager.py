@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("dotenv")
+
+from managers.n8nManager import n8nManager
+
+URL = "https://youtu.be/dQw4w9WgXcQ"
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setenv("N8N_OUTBOX_PATH", str(tmp_path / "outbox.sqlite3"))
+    monkeypatch.setenv("VIDEO_INDEX_PATH", str(tmp_path / "index.sqlite3"))
+    monkeypatch.setenv("N8N_START_URL", "http://n8n.local/start")
+    monkeypatch.setenv("N8N_ENQUEUE_URL", "http://n8n.local/enqueue")
+    monkeypatch.delenv("N8N_CALLBACK_PORT", raising=False)
+    return n8nManager()
+
+
+def fake_deliver(manager, monkeypatch, status):
+    calls = []
+
+    async def deliver(kind, payload):
+        calls.append((kind, payload))
+        return status, f"{status} note"
+
+    monkeypatch.setattr(manager, "_deliver", deliver)
+    return calls
+
+
+def test_failed_enqueue_releases_reserved_keys(manager, monkeypatch):
+    fake_deliver(manager, monkeypatch, "failed")
+    fresh, _ = manager.videos.reserve([URL], chat_id=1)
+    asyncio.run(manager.trigger_enqueue(1, fresh[0], reserved=True))
+    assert manager.videos.partition([URL])[0] == [URL]
+
+
+@pytest.mark.parametrize("status", ["sent", "queued"])
+def test_accepted_enqueue_keeps_reserved_keys(manager, monkeypatch, status):
+    fake_deliver(manager, monkeypatch, status)
+    manager.videos.reserve([URL], chat_id=1)
+    asyncio.run(manager.trigger_enqueue_batch(1, [URL], reserved=True))
+    assert manager.videos.partition([URL])[0] == []
+
+
+def test_forced_enqueue_remembers_only_on_success(manager, monkeypatch):
+    fake_deliver(manager, monkeypatch, "failed")
+    asyncio.run(manager.trigger_enqueue(1, URL))
+    assert manager.videos.partition([URL])[0] == [URL]
+    fake_deliver(manager, monkeypatch, "sent")
+    asyncio.run(manager.trigger_enqueue(1, URL))
+    assert manager.videos.partition([URL])[0] == []
+
+
+def test_dead_outbox_entry_releases_keys(manager):
+    manager.videos.remember([URL], chat_id=1)
+    manager._forget_enqueued({"kind": "enqueue", "payload": {"urls": [URL], "chat_id": 1}})
+    assert manager.videos.partition([URL])[0] == [URL]
+
+
+def test_start_is_not_added_while_one_is_pending(manager, monkeypatch):
+    calls = fake_deliver(manager, monkeypatch, "queued")
+    manager.start_flight.window = 0
+    manager.outbox.add("start", {"trigger": "manual", "chat_id": 1})
+    note = asyncio.run(manager.trigger_start(1))
+    assert calls == []
+    assert "уже ожидает" in note
+    assert manager.outbox.stats()["pending"] == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from managers.quotaLedger import quotaLedger
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(quotaLedger, "_today", staticmethod(lambda: "2024-01-01"))
+    return quotaLedger(str(tmp_path / "quota.json"), daily_budget=1000, degrade_at=0.5, refuse_at=0.9)
+
+
+def test_levels_and_refusal(ledger):
+    assert ledger.level() == "ok"
+    for _ in range(5):
+        ledger.spend("search.list")
+    assert ledger.used() == 500
+    assert ledger.level() == "degraded"
+    for _ in range(4):
+        ledger.spend("search.list")
+    assert ledger.used() == 900
+    assert ledger.level() == "exhausted"
+    # вызов сверх порога отказа отклоняется и ничего не списывает
+    with pytest.raises(RuntimeError):
+        ledger.spend("channels.list")
+    assert ledger.used() == 900
+
+def test_usage_persists_between_instances(ledger, tmp_path):
+    ledger.spend("channels.list")
+    ledger.spend("videos.list")
+    reloaded = quotaLedger(str(tmp_path / "quota.json"), daily_budget=1000)
+    assert reloaded.used() == 2
+    assert reloaded.data["2024-01-01"]["by_method"] == {"channels.list": 1, "videos.list": 1}
+
+
+def test_save_is_atomic_and_leaves_no_tmp(ledger, tmp_path):
+    ledger.spend("channels.list")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["quota.json"]
+
+
+def test_corrupted_file_is_kept_aside_and_logged(tmp_path, capsys):
+    path = tmp_path / "quota.json"
+    path.write_text('{"days": {"2024-01-01": {"tot', encoding="utf-8")
+    ledger = quotaLedger(str(path))
+    assert ledger.data == {}
+    assert (tmp_path / "quota.json.broken").read_text(encoding="utf-8").startswith('{"days"')
+    assert "quota.json" in capsys.readouterr().out
@@ -0,0 +1,77 @@
+import pytest
+
+from extractors import sheetMirror as mirror_module
+from extractors.sheetMirror import sheetMirror
+
+HEADER = ["date", "clips proccessed"]
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch, fake_clock):
+    monkeypatch.setattr(mirror_module, "time", fake_clock)
+    return sheetMirror(str(tmp_path / "mirror.sqlite3"), max_lag=30, reconcile_interval=3600)
+
+
+def test_first_sync_is_full_then_incremental(mirror, fake_worksheet, fake_clock):
+    ws = fake_worksheet([HEADER, ["10:00", "1"], ["11:00", "2"]])
+    assert mirror.sync(ws) == 3
+    assert ws.calls == ["get_all_values"]
+
+    ws.rows.append(["12:00", "3"])
+    ws.calls.clear()
+    fake_clock.now += 60
+    mirror.sync(ws)
+    # перечитывается последняя известная строка и всё, что ниже
+    assert ws.calls == ["get A3:ZZZ"]
+    assert mirror.values(ws) == [HEADER, ["10:00", "1"], ["11:00", "2"], ["12:00", "3"]]
+
+
+def test_in_place_edit_of_last_row_is_picked_up(mirror, fake_worksheet, fake_clock):
+    ws = fake_worksheet([HEADER, ["10:00", "1"]])
+    mirror.sync(ws)
+    ws.rows[-1] = ["10:00", "5"]
+    fake_clock.now += 60
+    assert mirror.tail(ws) == (HEADER, ["10:00", "5"])
+
+
+def test_shrunk_sheet_triggers_full_reconcile(mirror, fake_worksheet, fake_clock):
+    ws = fake_worksheet([HEADER, ["10:00", "1"], ["11:00", "2"]])
+    mirror.sync(ws)
+    del ws.rows[1:]
+    ws.calls.clear()
+    fake_clock.now += 60
+    mirror.sync(ws)
+    assert ws.calls == ["get A3:ZZZ", "get_all_values"]
+    assert mirror.values(ws) == [HEADER]
+    assert mirror.tail(ws) == (HEADER, None)
+
+
+def test_reconcile_interval_forces_full_sync(mirror, fake_worksheet, fake_clock):
+    ws = fake_worksheet([HEADER, ["10:00", "1"]])
+    mirror.sync(ws)
+    ws.rows[0] = ["date", "clips processed"]
+    fake_clock.now += 3600
+    ws.calls.clear()
+    mirror.sync(ws)
+    assert ws.calls == ["get_all_values"]
+    assert mirror.values(ws)[0] == ["date", "clips processed"]
+
+
+def test_tail_skips_blank_rows_and_respects_max_lag(mirror, fake_worksheet, fake_clock):
+    ws = fake_worksheet([[], ["", ""], HEADER, ["10:00", "1"], ["", ""]])
+    assert mirror.tail(ws) == (HEADER, ["10:00", "1"])
+    ws.calls.clear()
+    fake_clock.now += 10
+    mirror.tail(ws)
+    assert ws.calls == []
+
+
+def test_age_of_tail_and_whole_sheet(mirror, fake_worksheet, fake_clock):
+    ws = fake_worksheet([HEADER, ["10:00", "1"]])
+    assert mirror.age(ws) is None
+    mirror.sync(ws)
+    fake_clock.now += 600
+    mirror.sync(ws)
+    fake_clock.now += 5
+    assert mirror.age(ws) == 5
+    assert mirror.age(ws, whole=True) == 605
@@ -0,0 +1,56 @@
+from extractors.sheetWriteBuffer import sheetWriteBuffer
+
+
+def test_spool_survives_restart(tmp_path):
+    path = tmp_path / "spool.jsonl"
+    buf = sheetWriteBuffer(str(path))
+    buf.add("Descriptions", ["t1", 1, "https://youtu.be/dQw4w9WgXcQ", "one"], key="yt:dQw4w9WgXcQ")
+    buf.add("Descriptions", ["t2", 1, "", "two"])
+    assert buf.pending == 2
+
+    # "рестарт": новый буфер поднимает несброшенные строки из файла
+    reloaded = sheetWriteBuffer(str(path))
+    count, rows = reloaded.peek()
+    assert count == 2
+    assert rows[0] == {"sheet": "Descriptions", "values": ["t1", 1, "https://youtu.be/dQw4w9WgXcQ", "one"], "key": "yt:dQw4w9WgXcQ"}
+    assert rows[1]["key"] is None
+    assert reloaded.oldest_age() >= 0
+
+
+def test_commit_drops_only_flushed_rows(tmp_path):
+    path = tmp_path / "spool.jsonl"
+    buf = sheetWriteBuffer(str(path))
+    buf.add("Descriptions", ["t1", 1, "", "one"])
+    count, _ = buf.peek()
+    # строка пришла, пока шёл сброс, — она должна остаться
+    buf.add("Descriptions", ["t2", 1, "", "two"])
+    buf.commit(count)
+
+    reloaded = sheetWriteBuffer(str(path))
+    assert [r["values"][3] for r in reloaded.peek()[1]] == ["two"]
+    reloaded.commit(1)
+    assert sheetWriteBuffer(str(path)).pending == 0
+    assert reloaded.oldest_age() == 0.0
+
+
+def test_corrupted_tail_line_is_skipped(tmp_path):
+    path = tmp_path / "spool.jsonl"
+    buf = sheetWriteBuffer(str(path))
+    buf.add("Descriptions", ["t1", 1, "", "one"])
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"sheet": "Descr')
+    restarted = sheetWriteBuffer(str(path))
+    assert restarted.pending == 1
+    # новая строка не должна приклеиться к оборванной и потеряться при следующем рестарте
+    restarted.add("Descriptions", ["t2", 1, "", "two"])
+    assert restarted.pending == 2
+    again = sheetWriteBuffer(str(path))
+    assert [r["values"][3] for r in again.peek()[1]] == ["one", "two"]
+
+
+def test_missing_final_newline_is_repaired(tmp_path):
+    path = tmp_path / "spool.jsonl"
+    path.write_text('{"sheet": "Descriptions", "values": ["t1", 1, "", "one"], "key": null}', encoding="utf-8")
+    buf = sheetWriteBuffer(str(path))
+    buf.add("Descriptions", ["t2", 1, "", "two"])
+    assert sheetWriteBuffer(str(path)).pending == 2
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from managers.sheetsGateway import sheetsGateway, tokenBucket
+
+
+def test_thread_side_read_never_waits_for_quota():
+    gateway = sheetsGateway(read_per_minute=6)
+    started = time.monotonic()
+    assert [gateway.read(lambda i=i: i) for i in range(5)] == [0, 1, 2, 3, 4]
+    assert time.monotonic() - started < 1
+    # квоту перерасходовали — ждать её будут следующие задачи, на event loop
+    assert gateway.reads.delay() > 0
+    assert gateway.counters["reads"] == 5
+
+
+def test_same_key_jobs_run_once():
+    gateway = sheetsGateway()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "rows"
+
+    async def main():
+        tasks = [asyncio.create_task(gateway.run(fetch, key=("info", "stat"))) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(main()) == ["rows"] * 4
+    assert calls == [1]
+    assert gateway.counters["coalesced"] == 3
+
+
+def test_run_waits_for_quota_on_the_loop():
+    gateway = sheetsGateway(max_wait=5)
+    gateway.reads = tokenBucket(600, burst=1)
+    gateway.read(lambda: None)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        result = await gateway.run(lambda: "ok")
+        tick_task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert result == "ok"
+    assert gateway.counters["throttled"] == 1
+    # пока задача ждала квоту, цикл событий продолжал работать
+    assert ticks > 1
+
+
+def test_run_fails_fast_when_quota_is_beyond_max_wait():
+    gateway = sheetsGateway(read_per_minute=6, max_wait=1)
+    gateway.read(lambda: None)
+    calls = []
+
+    started = time.monotonic()
+    with pytest.raises(RuntimeError):
+        asyncio.run(gateway.run(calls.append, 1))
+    assert calls == []
+    assert time.monotonic() - started < 1
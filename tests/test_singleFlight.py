@@ -0,0 +1,97 @@
+import asyncio
+
+from managers import singleFlight as single_flight_module
+from managers.singleFlight import singleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def main():
+        flight = singleFlight()
+        release = asyncio.Event()
+
+        async def factory():
+            calls.append(1)
+            await release.wait()
+            return "done"
+
+        tasks = [asyncio.create_task(flight.do("start", factory)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(main())
+    assert calls == [1]
+    assert [r for r, _ in results] == ["done"] * 5
+    assert sorted(merged for _, merged in results) == [False, True, True, True, True]
+
+
+def test_window_reuses_result_until_it_expires(monkeypatch, fake_clock):
+    monkeypatch.setattr(single_flight_module, "time", fake_clock)
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        flight = singleFlight(window=60)
+        out = [await flight.do("start", factory)]
+        fake_clock.now += 59
+        out.append(await flight.do("start", factory))
+        fake_clock.now += 2
+        out.append(await flight.do("start", factory))
+        return out
+
+    assert asyncio.run(main()) == [(1, False), (1, True), (2, False)]
+
+
+def test_cache_if_and_errors_are_not_remembered():
+    calls = []
+
+    async def main():
+        flight = singleFlight(window=60)
+
+        async def failed():
+            calls.append("failed")
+            return "failed"
+
+        async def boom():
+            calls.append("boom")
+            raise RuntimeError("n8n down")
+
+        await flight.do("k", failed, cache_if=lambda r: r != "failed")
+        await flight.do("k", failed, cache_if=lambda r: r != "failed")
+        for _ in range(2):
+            try:
+                await flight.do("e", boom)
+            except RuntimeError:
+                pass
+
+    asyncio.run(main())
+    assert calls == ["failed", "failed", "boom", "boom"]
+
+
+def test_cancelled_leader_does_not_cancel_merged_callers():
+    async def main():
+        flight = singleFlight()
+        release = asyncio.Event()
+
+        async def factory():
+            await release.wait()
+            return "sent"
+
+        leader = asyncio.create_task(flight.do("start", factory))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("start", factory))
+        await asyncio.sleep(0)
+        # /autostop отменяет задачу таймера, которая начала запуск
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return leader, await follower
+
+    leader, follower_result = asyncio.run(main())
+    assert leader.cancelled()
+    assert follower_result == ("sent", True)
@@ -0,0 +1,25 @@
+from managers import ttlCache as ttl_cache_module
+from managers.ttlCache import ttlCache
+
+
+def test_fresh_stale_and_expired(monkeypatch, fake_clock):
+    monkeypatch.setattr(ttl_cache_module, "time", fake_clock)
+    cache = ttlCache(ttl=60, max_stale=300)
+    cache.set("UC1", {"subs": 1})
+
+    value, age = cache.get("UC1")
+    assert value == {"subs": 1} and cache.is_fresh(age)
+
+    fake_clock.now += 120
+    value, age = cache.get("UC1")
+    assert value == {"subs": 1} and not cache.is_fresh(age)
+
+    fake_clock.now += 240
+    assert cache.get("UC1") is None
+
+
+def test_invalidate():
+    cache = ttlCache()
+    cache.set("k", 1)
+    cache.invalidate("k")
+    assert cache.get("k") is None
@@ -0,0 +1,63 @@
+import pytest
+
+from managers.videoIndex import canonical_key, canonical_video_id, videoIndex
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize("url", [
+    f"https://www.youtube.com/watch?v={VIDEO_ID}",
+    f"https://youtube.com/watch?v={VIDEO_ID}&t=42s&list=PL123",
+    f"http://m.youtube.com/watch?feature=share&v={VIDEO_ID}",
+    f"https://youtu.be/{VIDEO_ID}",
+    f"https://youtu.be/{VIDEO_ID}?si=abc",
+    f"https://www.youtube.com/shorts/{VIDEO_ID}",
+    f"https://www.youtube.com/embed/{VIDEO_ID}",
+    f"https://www.youtube.com/live/{VIDEO_ID}?feature=share",
+    f"https://music.youtube.com/watch?v={VIDEO_ID}",
+    f"  https://WWW.YOUTUBE.COM/watch?v={VIDEO_ID}#comments  ",
+])
+def test_youtube_variants_share_one_key(url):
+    assert canonical_video_id(url) == VIDEO_ID
+    assert canonical_key(url) == f"yt:{VIDEO_ID}"
+
+
+def test_other_urls_are_normalised():
+    assert canonical_key("https://Example.com/video/") == "url:example.com/video"
+    assert canonical_key("https://example.com/video#part") == "url:example.com/video"
+    assert canonical_key("https://example.com/v?id=1") != canonical_key("https://example.com/v?id=2")
+    # невалидный ID не должен превращаться в yt-ключ
+    assert canonical_key("https://youtu.be/short").startswith("url:")
+
+
+@pytest.mark.parametrize("use_bloom", [False, True])
+def test_partition_remember_and_forget(tmp_path, use_bloom):
+    index = videoIndex(str(tmp_path / "index.sqlite3"), use_bloom=use_bloom)
+    watch = f"https://www.youtube.com/watch?v={VIDEO_ID}"
+    short = f"https://youtu.be/{VIDEO_ID}"
+    other = "https://example.com/a"
+
+    fresh, dups = index.partition([watch, short, other])
+    assert fresh == [watch, other]
+    assert dups == [(short, None)]
+
+    index.remember(fresh, chat_id=1)
+    fresh, dups = index.partition([short, other])
+    assert fresh == []
+    assert [u for u, _ in dups] == [short, other]
+
+    index.forget([short])
+    fresh, _ = index.partition([watch, other])
+    assert fresh == [watch]
+    index.close()
+
+
+def test_reserve_blocks_second_caller_before_delivery(tmp_path):
+    index = videoIndex(str(tmp_path / "index.sqlite3"))
+    fresh, _ = index.reserve([f"https://www.youtube.com/watch?v={VIDEO_ID}"], chat_id=1)
+    assert fresh == [f"https://www.youtube.com/watch?v={VIDEO_ID}"]
+    # второй /enqueue того же видео в другой форме, пока первый ещё отправляется
+    fresh, dups = index.reserve([f"https://youtu.be/{VIDEO_ID}"], chat_id=2)
+    assert fresh == []
+    assert len(dups) == 1
+    index.close()
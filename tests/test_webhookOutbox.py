@@ -0,0 +1,61 @@
+import pytest
+
+from managers.webhookOutbox import webhookOutbox
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = webhookOutbox(str(tmp_path / "outbox.sqlite3"), base_delay=2.0, max_delay=30.0, max_attempts=5)
+    yield box
+    box.close()
+
+
+def test_backoff_stays_within_equal_jitter_bounds(outbox):
+    for attempts in range(1, 12):
+        cap = min(outbox.max_delay, outbox.base_delay * 2 ** (attempts - 1))
+        for _ in range(50):
+            delay = outbox._backoff(attempts)
+            assert cap / 2 <= delay <= cap
+
+
+def test_reschedule_grows_delay_then_marks_dead(outbox):
+    entry_id = outbox.add("enqueue", {"url": "https://youtu.be/dQw4w9WgXcQ"})
+    delays = [outbox.reschedule(entry_id, "HTTP 503") for _ in range(outbox.max_attempts - 1)]
+    assert all(d is not None for d in delays)
+    for attempts, delay in enumerate(delays, start=1):
+        cap = min(outbox.max_delay, outbox.base_delay * 2 ** (attempts - 1))
+        assert cap / 2 <= delay <= cap
+    # вне окна до следующей попытки запись не выдаётся
+    assert outbox.due() == []
+
+    assert outbox.reschedule(entry_id, "HTTP 503") is None
+    assert outbox.stats() == {"pending": 0, "dead": 1}
+    outbox.release_all()
+    assert outbox.due() == []
+
+
+def test_due_leases_entries_and_release_all_replays(outbox):
+    first = outbox.add("start", {"trigger": "manual"})
+    second = outbox.add("enqueue", {"url": "https://example.com/a"})
+    assert [e["id"] for e in outbox.due(lease=60)] == [first, second]
+    assert outbox.due(lease=60) == []
+    assert outbox.release_all() == 2
+    entries = outbox.due()
+    assert [e["kind"] for e in entries] == ["start", "enqueue"]
+    assert entries[1]["payload"] == {"url": "https://example.com/a"}
+    outbox.mark_delivered(first)
+    outbox.mark_dead(second, "HTTP 400")
+    assert outbox.stats() == {"pending": 0, "dead": 1}
+
+
+
+def test_collapse_keeps_single_pending_start(outbox):
+    keep = outbox.add("start", {"n": 1})
+    outbox.add("start", {"n": 2})
+    outbox.add("start", {"n": 3})
+    other = outbox.add("enqueue", {"url": "https://example.com/a"})
+    assert outbox.pending_of("start") == keep
+    assert outbox.collapse("start") == 2
+    assert [e["id"] for e in outbox.due()] == [keep, other]
+    outbox.mark_delivered(keep)
+    assert outbox.pending_of("start") is None
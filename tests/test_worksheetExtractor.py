@@ -0,0 +1,203 @@
+import pytest
+
+pytest.importorskip("gspread")
+pytest.importorskip("pandas")
+
+from extractors.worksheetExtractor import worksheetExtractor
+
+HEADER = ["date", "videos proccessed", "clips proccessed", "videos in queue", "clips in queue"]
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    return worksheetExtractor("creds.json", "https://sheets.local/x", spool_path=str(tmp_path / "spool.jsonl"))
+
+
+def metrics(v, c, vq, cq):
+    return {"videos_processed": v, "clips_processed": c, "videos_in_queue": vq, "clips_in_queue": cq}
+
+
+def test_tail_matches_full_scan(extractor, fake_worksheet):
+    ws = fake_worksheet([
+        [], ["", ""], HEADER,
+        ["01.01.2024 10:00", "1", "10", "5", "50"],
+        ["01.01.2024 11:00", "2", "25", "4", "35"],
+    ])
+    assert extractor._get_active_sheet_values_tail(ws) == metrics(2, 25, 4, 35)
+    assert extractor._get_active_sheet_values_full(ws) == metrics(2, 25, 4, 35)
+    # тёплый путь: заголовок из кэша, одно чтение колонок
+    ws.calls.clear()
+    assert extractor._get_active_sheet_values(ws) == metrics(2, 25, 4, 35)
+    assert len(ws.calls) == 1 and ws.calls[0].startswith("batch_get")
+
+
+def test_tail_sees_newest_row_with_blank_column_a(extractor, fake_worksheet):
+    ws = fake_worksheet([
+        HEADER,
+        ["01.01.2024 10:00", "1", "10", "5", "50"],
+        ["", "2", "30", "3", "20"],
+    ])
+    assert extractor._get_active_sheet_values_tail(ws) == metrics(2, 30, 3, 20)
+    assert extractor._get_active_sheet_values_full(ws) == metrics(2, 30, 3, 20)
+
+
+def test_duplicate_headers_resolve_the_same_on_both_paths(extractor, fake_worksheet):
+    ws = fake_worksheet([
+        HEADER + ["clips in queue"],
+        ["01.01.2024 10:00", "1", "10", "5", "50", "7"],
+    ])
+    assert extractor._get_active_sheet_values_tail(ws)["clips_in_queue"] == 7
+    assert extractor._get_active_sheet_values_full(ws)["clips_in_queue"] == 7
+
+
+def test_header_only_sheet_is_empty(extractor, fake_worksheet):
+    ws = fake_worksheet([HEADER])
+    assert extractor._get_active_sheet_values(ws) == metrics(0, 0, 0, 0)
+
+
+def test_rate_limit_does_not_trigger_full_scan(extractor, fake_worksheet, monkeypatch):
+    ws = fake_worksheet([HEADER, ["01.01.2024 10:00", "1", "10", "5", "50"]])
+
+    def limited(fn, *args, **kwargs):
+        raise RuntimeError("лимит запросов к Google Sheets исчерпан, попробуйте позже")
+
+    monkeypatch.setattr(extractor.gateway, "read", limited)
+    with pytest.raises(RuntimeError):
+        extractor._get_active_sheet_values(ws)
+    assert "get_all_values" not in ws.calls
+
+
+def test_col_letter():
+    assert [worksheetExtractor._col_letter(i) for i in (0, 25, 26, 51, 52)] == ["A", "Z", "AA", "AZ", "BA"]
+
+
+def test_concurrent_flushes_write_each_row_once(extractor, fake_worksheet, monkeypatch):
+    import threading
+    import time
+
+    ws = fake_worksheet([extractor.DESCRIPTION_COLUMNS], title="Descriptions")
+    monkeypatch.setattr(extractor, "_get_or_create_worksheet", lambda name, header: ws)
+    slow_append = ws.append_rows
+
+    def append_rows(values, value_input_option=None):
+        time.sleep(0.05)
+        return slow_append(values, value_input_option=value_input_option)
+
+    ws.append_rows = append_rows
+    extractor.append_description(description="one", video_url=None, chat_id=1, timestamp_iso="t1")
+    extractor.append_description(description="two", video_url=None, chat_id=1, timestamp_iso="t2")
+
+    threads = [threading.Thread(target=extractor.flush_descriptions) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [r[3] for r in ws.rows[1:]] == ["one", "two"]
+    assert extractor._write_buffer.pending == 0
+
+
+def description_entry(url, text):
+    from managers.videoIndex import canonical_key
+    return {"sheet": "Descriptions", "values": ["t", 1, url, text], "key": canonical_key(url) if url else None}
+
+
+A = "https://youtu.be/aaaaaaaaaaa"
+B = "https://www.youtube.com/watch?v=bbbbbbbbbbb"
+
+
+def test_plan_upsert_collapses_repeats_to_last():
+    index = {"yt:aaaaaaaaaaa": 2}
+    entries = [
+        description_entry(A, "a1"), description_entry(B, "b1"),
+        description_entry(A, "a2"), description_entry(B, "b2"), description_entry(None, "free"),
+    ]
+    updates, appends = worksheetExtractor._plan_upsert(index, entries)
+    assert {row: e["values"][3] for row, e in updates.items()} == {2: "a2"}
+    assert [e["values"][3] for e in appends] == ["b2", "free"]
+
+
+def test_upsert_updates_in_place_and_appends(extractor, fake_worksheet):
+    ws = fake_worksheet([extractor.DESCRIPTION_COLUMNS, ["t", 1, A, "old"]], title="Descriptions")
+    extractor._upsert_rows(ws, [description_entry("https://www.youtube.com/shorts/aaaaaaaaaaa", "new"), description_entry(B, "b")])
+    assert [r[3] for r in ws.rows[1:]] == ["new", "b"]
+    # номер добавленной строки попадает в индекс без перечитывания колонки
+    ws.calls.clear()
+    extractor._upsert_rows(ws, [description_entry(B, "b2")])
+    assert [r[3] for r in ws.rows[1:]] == ["new", "b2"]
+    assert "col_values 3" not in ws.calls
+
+
+def test_moved_rows_are_detected_before_update(extractor, fake_worksheet):
+    ws = fake_worksheet(
+        [extractor.DESCRIPTION_COLUMNS, ["t", 1, A, "a"], ["t", 1, B, "b"]], title="Descriptions"
+    )
+    extractor._upsert_rows(ws, [description_entry(B, "b1")])
+    # оператор удалил строку с A: B сдвинулась на строку 2, кэш всё ещё указывает на 3
+    del ws.rows[1]
+    assert not extractor._rows_still_match(ws, {3: description_entry(B, "x")})
+    extractor._upsert_rows(ws, [description_entry(B, "b2")])
+    assert ws.rows == [extractor.DESCRIPTION_COLUMNS, ["t", 1, B, "b2"]]
+
+
+def test_url_index_expires_with_metadata_ttl(extractor, fake_worksheet, fake_clock, monkeypatch):
+    import extractors.worksheetExtractor as module
+
+    monkeypatch.setattr(module, "time", fake_clock)
+    ws = fake_worksheet([extractor.DESCRIPTION_COLUMNS, ["t", 1, A, "a"]], title="Descriptions")
+    extractor._get_url_rows(ws)
+    ws.calls.clear()
+    extractor._get_url_rows(ws)
+    assert ws.calls == []
+    fake_clock.now += extractor.metadata_ttl
+    extractor._get_url_rows(ws)
+    assert ws.calls == ["col_values 3"]
+
+
+def analytics_for(extractor, ws, monkeypatch, **kwargs):
+    monkeypatch.setattr(extractor, "_get_sheet", lambda name: ws)
+    return extractor.get_throughput_analytics("stat", **kwargs)
+
+
+def test_analytics_with_blank_rows_above_header(extractor, fake_worksheet, monkeypatch):
+    ws = fake_worksheet([
+        [], ["", "", ""], HEADER,
+        ["01.01.2024 10:00", "1", "10", "5", "50"],
+        ["01.01.2024 11:00", "2", "20", "4", "40"],
+        ["01.01.2024 12:00", "3", "35", "3", "30"],
+    ])
+    res = analytics_for(extractor, ws, monkeypatch)
+    assert res["rows"] == 3 and res["timed"]
+    assert res["span_hours"] == 2.0
+    assert res["clips_per_unit"] == 12.5
+    assert res["videos_per_unit"] == 1.0
+    assert res["queue_drain_per_unit"] == 10.0
+    assert res["clips_hourly_peak"] == 15.0
+    assert res["backlog_eta_units"] == 3.0
+
+
+def test_analytics_without_time_column_uses_row_window(extractor, fake_worksheet, monkeypatch):
+    header = [h for h in HEADER if h != "date"]
+    rows = [[str(i), str(i * 10), "0", str(100 - i)] for i in range(30)]
+    ws = fake_worksheet([header] + rows)
+    res = analytics_for(extractor, ws, monkeypatch, window_hours=1, window_rows=5)
+    assert not res["timed"]
+    assert res["window_rows"] == 5
+    assert res["clips_per_unit"] == 10.0
+    assert res["queue_drain_per_unit"] == 1.0
+
+
+def test_analytics_needs_two_rows(extractor, fake_worksheet, monkeypatch):
+    ws = fake_worksheet([HEADER, ["01.01.2024 10:00", "1", "10", "5", "50"]])
+    assert analytics_for(extractor, ws, monkeypatch) == {"rows": 1, "timed": False}
+
+
+def test_mirror_metrics_come_from_header_and_last_row(tmp_path, fake_worksheet):
+    from extractors.sheetMirror import sheetMirror
+
+    mirror = sheetMirror(str(tmp_path / "mirror.sqlite3"))
+    extractor = worksheetExtractor(
+        "creds.json", "https://sheets.local/x", spool_path=str(tmp_path / "spool.jsonl"), mirror=mirror
+    )
+    ws = fake_worksheet([[], HEADER, ["01.01.2024 10:00", "1", "10", "5", "50"], ["01.01.2024 11:00", "2", "25", "4", "35"]])
+    assert extractor._get_active_sheet_values(ws) == metrics(2, 25, 4, 35)
+    assert extractor._get_active_sheet_values(ws) == extractor._get_active_sheet_values_full(ws)
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+pytest.importorskip("pandas")
+
+from managers import ttlCache as ttl_cache_module
+from managers.quotaLedger import quotaLedger
+from extractors.youtubeExtractor import youtubeExtractor
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    return youtubeExtractor(api_key="test", stats_ttl=60, stats_max_stale=600, quota=quotaLedger(str(tmp_path / "quota.json")))
+
+
+def test_failed_background_refresh_is_logged_and_stale_data_served(extractor, monkeypatch, fake_clock, capsys):
+    monkeypatch.setattr(ttl_cache_module, "time", fake_clock)
+    extractor._stats_cache.set("UC1", {"subs": 10})
+    fake_clock.now += 120
+
+    def broken(channel_id):
+        raise RuntimeError("HTTP 500")
+
+    monkeypatch.setattr(extractor, "_get_channel_core_stats", broken)
+
+    async def main():
+        data = await extractor.get_channel_stats("UC1")
+        await asyncio.gather(*extractor._background_tasks, return_exceptions=True)
+        await asyncio.sleep(0)
+        return data
+
+    data = asyncio.run(main())
+    assert data == {"subs": 10, "age": 120}
+    assert extractor._background_tasks == set()
+    assert "HTTP 500" in capsys.readouterr().out
+
+
+def test_stale_batch_refresh_is_tracked(extractor, monkeypatch, fake_clock):
+    monkeypatch.setattr(ttl_cache_module, "time", fake_clock)
+    extractor._stats_cache.set("UC1", {"subs": 1})
+    extractor._stats_cache.set("UC2", {"subs": 2})
+    fake_clock.now += 120
+    seen = []
+
+    async def fetch(channel_ids):
+        seen.append(list(channel_ids))
+        return {}
+
+    monkeypatch.setattr(extractor, "_fetch_channels_stats", fetch)
+
+    async def main():
+        out = await extractor.get_channels_stats(["UC1", "UC2"])
+        assert len(extractor._background_tasks) == 1
+        await asyncio.gather(*extractor._background_tasks)
+        await asyncio.sleep(0)
+        return out
+
+    out = asyncio.run(main())
+    assert out["UC2"] == {"subs": 2, "age": 120}
+    assert seen == [["UC1", "UC2"]]
+    assert extractor._background_tasks == set()
+
+
+class fakeRequest:
+    def __init__(self, uri, responses):
+        self.uri = uri
+        self.headers = {}
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def execute(self):
+        self.sent_headers.append(dict(self.headers))
+        res = self.responses.pop(0)
+        if isinstance(res, Exception):
+            raise res
+        return res
+
+
+def http_error(status):
+    import httplib2
+    from googleapiclient.errors import HttpError
+    return HttpError(httplib2.Response({"status": status}), b"")
+
+
+def test_etag_304_reuses_cached_body(extractor):
+    uri = "https://youtube.googleapis.com/youtube/v3/channels?id=UC1"
+    body = {"etag": "E1", "items": [{"id": "UC1"}]}
+    first = fakeRequest(uri, [body])
+    assert extractor._execute("channels.list", first) == body
+    assert "If-None-Match" not in first.sent_headers[0]
+
+    second = fakeRequest(uri, [http_error(304)])
+    assert extractor._execute("channels.list", second) == body
+    assert second.sent_headers[0]["If-None-Match"] == "E1"
+    # 304 всё равно стоит единицу квоты
+    assert extractor.quota.used() == 2
+
+
+def test_etag_errors_and_other_methods(extractor):
+    uri = "https://youtube.googleapis.com/youtube/v3/search?q=x"
+    req = fakeRequest(uri, [{"etag": "S1", "items": []}, {"etag": "S1", "items": []}])
+    extractor._execute("search.list", req)
+    extractor._execute("search.list", req)
+    assert req.sent_headers == [{}, {}]
+
+    uri = "https://youtube.googleapis.com/youtube/v3/channels?id=UC2"
+    extractor._execute("channels.list", fakeRequest(uri, [{"etag": "E2"}]))
+    with pytest.raises(Exception):
+        extractor._execute("channels.list", fakeRequest(uri, [http_error(500)]))
+
+
+def test_etag_cache_is_bounded(extractor, monkeypatch):
+    monkeypatch.setattr(youtubeExtractor, "ETAG_CACHE_SIZE", 2)
+    for i in range(3):
+        extractor._execute("channels.list", fakeRequest(f"u{i}", [{"etag": f"E{i}"}]))
+    assert list(extractor._etags) == ["u1", "u2"]